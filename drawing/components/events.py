@@ -142,7 +142,7 @@ def handle_keys(key, selected, simplex_tree):
     
     if key == pygame.K_r:
         selected = []
-        simplex_tree = SimplexTree()
+        simplex_tree = SimplexTree(track_homology=True)
     
     # Reset screen
     SCREEN.fill(BACKGROUND_COLOR)
@@ -26,7 +26,7 @@ def main():
     points = []
     selected = []
 
-    simplex_tree = SimplexTree()
+    simplex_tree = SimplexTree(track_homology=True)
 
     betti_numbers = []
     
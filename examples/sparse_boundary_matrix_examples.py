@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from simplicial.boundary_matrix import SparseBoundaryMatrix
 
 
@@ -295,4 +298,29 @@ print(f'2-Sphere:\t{sphere.euler_characteristic()}')
 print(f'Cylinder:\t{cylinder.euler_characteristic()}')
 print(f'Mobius Strip:\t{mobius.euler_characteristic()}')
 print(f'Torus:\t\t{torus.euler_characteristic()}')
-print(f'Klein Bottle:\t{klein.euler_characteristic()}')
\ No newline at end of file
+print(f'Klein Bottle:\t{klein.euler_characteristic()}')
+
+print('\nSTORAGE\n')
+
+'''
+Reopen the torus from an on-disk store and from a saved file, and append
+a separate edge to each copy, which adds a connected component.
+'''
+with tempfile.TemporaryDirectory() as directory:
+    store = os.path.join(directory, 'store')
+    torus.to_store(store)
+    stored = SparseBoundaryMatrix.from_store(store, mmap=False)
+    stored.add_full_simplices([[9,10]])
+
+    path = os.path.join(directory, 'torus.bin')
+    torus.save(path)
+    saved = SparseBoundaryMatrix.load(path, mmap=False)
+    saved.add_full_simplices([[9,10]])
+
+# Expected: [2,2,1] for every method
+for method in ['snf', 'column', 'twist', 'cohomology']:
+    print(
+        f'{method}:\t'
+        f'{stored.compute_betti_numbers(method=method)}\t'
+        f'{saved.compute_betti_numbers(method=method)}'
+    )
@@ -0,0 +1,409 @@
+import numpy as np
+
+from simplicial.arrays import GrowableArray
+from simplicial.boundary_matrix import SparseBoundaryMatrix
+
+class ArraySimplexTree:
+    '''
+    A compact, array-backed implementation of the simplex tree data
+    structure.
+
+    Rather than storing one Python object per simplex, every node is a
+    row in a set of flat NumPy arrays: the interned integer id of its
+    label, the index of its parent, and its depth. Children are kept in
+    CSR-style blocks sorted by (parent, label) and searched by binary
+    search. Nodes created since the blocks were last built are held in a
+    small pending dictionary, and the blocks are rebuilt once it grows
+    past a fraction of the tree, so that insertion stays amortized
+    O(log n).
+
+    Node 0 is the root and represents the null simplex. Nodes are
+    referred to by their integer index.
+
+    Attributes:
+    -----------
+    dimension : int
+        The dimension of the simplicial complex stored in the simplex
+        tree. Defined as the maximum dimension of any simplex in the
+        complex.
+    '''
+
+    # Minimum number of pending nodes before the child blocks are
+    # rebuilt, and the fraction of the tree they may reach otherwise
+    _min_pending = 1024
+    _max_pending_fraction = 1 / 32
+
+    def __init__(self):
+        self.dimension = -1
+
+        # Interned vertex labels
+        self._labels = []
+        self._label_ids = dict()
+
+        # Per-node arrays, starting with the root
+        self._node_labels = GrowableArray([-1], dtype=np.int32)
+        self._node_parents = GrowableArray([-1], dtype=np.int32)
+        self._node_depths = GrowableArray([0], dtype=np.int8)
+
+        # CSR-style child blocks sorted by (parent, label)
+        self._child_ptr = np.zeros(2, dtype=np.int32)
+        self._child_labels = np.zeros(0, dtype=np.int32)
+        self._child_nodes = np.zeros(0, dtype=np.int32)
+
+        # Nodes created since the blocks were last built, keyed by
+        # (parent << 32) | label, and as parallel lists of labels,
+        # parents and depths
+        self._pending = dict()
+        self._pending_nodes = ([], [], [])
+
+        pass
+
+    def __len__(self):
+        '''
+        Number of (non-null) simplices in the complex.
+        '''
+        n_built = self._node_labels.array.shape[0]
+        return n_built + len(self._pending) - 1
+
+    def _intern(self, label):
+        '''
+        Helper function for getting the integer id of a label, assigning
+        a new one if necessary.
+        '''
+        label_id = self._label_ids.get(label)
+        if label_id is None:
+            label_id = len(self._labels)
+            self._labels.append(label)
+            self._label_ids[label] = label_id
+        return label_id
+
+    def _build_child_blocks(self):
+        '''
+        Helper function for moving pending nodes into the per-node arrays
+        and merging them into the sorted child blocks.
+
+        Only the pending nodes are sorted, by (parent, label), and each is
+        placed in the block of its parent by binary search, so that a
+        rebuild takes time linear in the size of the tree and no more
+        than one temporary array of that size.
+        '''
+        pending_labels, pending_parents, pending_depths = self._pending_nodes
+        n_built = self._node_labels.array.shape[0]
+        self._node_labels.extend(pending_labels)
+        self._node_parents.extend(pending_parents)
+        self._node_depths.extend(pending_depths)
+        self._pending_nodes = ([], [], [])
+        self._pending = dict()
+
+        labels = self._node_labels.array[n_built:]
+        parents = self._node_parents.array[n_built:]
+        n_nodes = n_built + labels.shape[0]
+        dtype = self._node_parents.array.dtype
+
+        order = np.lexsort((labels, parents))
+        labels = labels[order]
+        parents = parents[order]
+        nodes = (order + n_built).astype(dtype)
+
+        # Binary search for each new child within the block of its parent,
+        # all at once, so that no temporary arrays the size of the tree
+        # are needed
+        ptr = self._child_ptr
+        n_blocks = ptr.shape[0] - 1
+        lo = ptr[np.minimum(parents, n_blocks)].astype(np.int64)
+        hi = ptr[np.minimum(parents + 1, n_blocks)].astype(np.int64)
+        active = np.flatnonzero(lo < hi)
+        while active.shape[0]:
+            mid = (lo[active] + hi[active]) // 2
+            right = self._child_labels[mid] < labels[active]
+            lo[active[right]] = mid[right] + 1
+            hi[active[~right]] = mid[~right]
+            active = active[lo[active] < hi[active]]
+
+        # Move the existing children up to make room for the new ones
+        n_children = ptr[-1] + labels.shape[0]
+        positions = lo + np.arange(labels.shape[0])
+        moved = np.ones(n_children, dtype=bool)
+        moved[positions] = False
+        for name, new in (('_child_labels', labels), ('_child_nodes', nodes)):
+            merged = np.empty(n_children, dtype=new.dtype)
+            merged[positions] = new
+            merged[moved] = getattr(self, name)
+            setattr(self, name, merged)
+        del moved
+
+        # Shift the block offsets by the number of new children before
+        # them, which only changes at the parents of new children
+        parents, counts = np.unique(parents, return_counts=True)
+        lengths = np.diff(parents, prepend=0, append=n_nodes)
+        shift = np.repeat(
+            np.concatenate(([0], np.cumsum(counts))).astype(dtype), lengths
+        )
+        self._child_ptr = np.empty(n_nodes + 1, dtype=dtype)
+        self._child_ptr[:ptr.shape[0]] = ptr
+        self._child_ptr[ptr.shape[0]:] = ptr[-1]
+        self._child_ptr[1:] += shift
+
+    def _get_child(self, node, label_id):
+        '''
+        Helper function for getting the child of a node with the given
+        label id. Returns -1 if there is no such child.
+        '''
+        child = self._pending.get((node << 32) | label_id)
+        if child is not None:
+            return child
+
+        if node + 1 >= self._child_ptr.shape[0]:
+            return -1
+
+        start, stop = self._child_ptr[node], self._child_ptr[node+1]
+        block = self._child_labels[start:stop]
+        i = np.searchsorted(block, label_id)
+        if i < block.shape[0] and block[i] == label_id:
+            return int(self._child_nodes[start+i])
+        return -1
+
+    def _get_depth(self, node):
+        '''
+        Helper function for getting the depth of a node, which may still
+        be pending.
+        '''
+        n_built = self._node_depths.array.shape[0]
+        if node < n_built:
+            return int(self._node_depths.array[node])
+        return self._pending_nodes[2][node - n_built]
+
+    def _create_node(self, label_id, parent):
+        '''
+        Helper function for creating a child node of parent.
+        '''
+        node = len(self) + 1
+        depth = self._get_depth(parent) + 1
+
+        pending_labels, pending_parents, pending_depths = self._pending_nodes
+        pending_labels.append(label_id)
+        pending_parents.append(parent)
+        pending_depths.append(depth)
+        self._pending[(parent << 32) | label_id] = node
+
+        if depth - 1 > self.dimension:
+            self.dimension = depth - 1
+
+        max_pending = len(self) * self._max_pending_fraction
+        if len(self._pending) > max(self._min_pending, max_pending):
+            self._build_child_blocks()
+
+        return node
+
+    def search_simplex(self, *simplex):
+        '''
+        Find a simplex in the simplex tree and return its node. If not
+        found, returns None.
+
+        Parameters:
+        -----------
+        simplex :  list[Any]
+            Simplex given as an enumeration of its vertices.
+
+        Returns:
+        --------
+        node : int
+            If found, the index of the node representing the simplex.
+        '''
+        node = 0
+        for vertex in simplex:
+            label_id = self._label_ids.get(vertex)
+            if label_id is None:
+                return None
+            node = self._get_child(node, label_id)
+            if node < 0:
+                return None
+        return node
+
+    def insert_simplex(self, *simplex):
+        '''
+        Insert a simplex into the ArraySimplexTree.
+
+        Requires that the simplex's faces are already present in the
+        ArraySimplexTree, per the defninition of a simplicial complex.
+
+        Parameters:
+        -----------
+        simplex :  list[Any]
+            Simplex given as an enumeration of its vertices.
+        '''
+        simplex_partial = simplex[:-1]
+        node = self.search_simplex(*simplex_partial)
+
+        if node is None:
+            raise ValueError(f'Simplex {simplex_partial} is not in complex.')
+
+        label_id = self._intern(simplex[-1])
+        if self._get_child(node, label_id) < 0:
+            self._create_node(label_id, node)
+
+        return
+
+    def insert_simplices(self, simplices):
+        for simplex in simplices:
+            self.insert_simplex(*simplex)
+
+    def _insert_full_simplex(self, label_ids, node=0):
+        '''
+        Helper function for simplex insertion. Inserts the simplex, given
+        by interned label ids, below the given node, creating new nodes
+        and recursing as needed.
+        '''
+        for i, label_id in enumerate(label_ids):
+            child = self._get_child(node, label_id)
+            if child < 0:
+                child = self._create_node(label_id, node)
+            self._insert_full_simplex(label_ids[i+1:], node=child)
+
+    def insert_full_simplex(self, *simplex):
+        '''
+        Insert a simplex into the ArraySimplexTree. Inserts any faces of
+        the simplex that are not already present.
+
+        Parameters:
+        -----------
+        simplex :  list[Any]
+            Simplex given as an enumeration of its vertices.
+        '''
+        self._insert_full_simplex([self._intern(v) for v in simplex])
+        return
+
+    def insert_full_simplices(self, simplices):
+        for simplex in simplices:
+            self.insert_full_simplex(*simplex)
+
+    def locate_k_simplices(self, k):
+        '''
+        Locate all k-simplices in the ArraySimplexTree.
+
+        Parameters:
+        -----------
+        k : int
+            Dimension of simplices to locate.
+
+        Returns:
+        --------
+        k_simplices : ndarray
+            Indices of the nodes representing the k-simplices in the
+            ArraySimplexTree.
+        '''
+        if self._pending:
+            self._build_child_blocks()
+        return np.flatnonzero(self._node_depths.array == k + 1)
+
+    def _get_vertex_ids(self, nodes, k):
+        '''
+        Helper function for getting the interned vertex ids of the given
+        k-simplex nodes, one simplex per row.
+        '''
+        labels = self._node_labels.array
+        parents = self._node_parents.array
+
+        vertex_ids = np.empty((nodes.shape[0], k+1), dtype=labels.dtype)
+        for j in reversed(range(k+1)):
+            vertex_ids[:, j] = labels[nodes]
+            nodes = parents[nodes]
+        return vertex_ids
+
+    def get_vertex_list(self, node):
+        '''
+        Get the vertices of the simplex represented by a node.
+
+        Parameters:
+        -----------
+        node : int
+            Index of a node in the ArraySimplexTree.
+
+        Returns:
+        --------
+        vertex_list : list[Any]
+            The vertices of the simplex, ordered from the root down.
+        '''
+        if self._pending:
+            self._build_child_blocks()
+        k = self._node_depths.array[node] - 1
+        vertex_ids = self._get_vertex_ids(np.array([node]), k)[0]
+        return [self._labels[i] for i in vertex_ids]
+
+    def get_k_simplices(self, k):
+        '''
+        Get the vertices of all k-simplices in the ArraySimplexTree.
+
+        Parameters:
+        -----------
+        k : int
+            Dimension of simplices to get.
+
+        Returns:
+        --------
+        k_simplices : ndarray
+            Array of shape (n_k, k+1) listing the vertex labels of each
+            k-simplex.
+        '''
+        labels = np.empty(len(self._labels), dtype=object)
+        labels[:] = self._labels
+        vertex_ids = self._get_vertex_ids(self.locate_k_simplices(k), k)
+        return labels[vertex_ids]
+
+    def boundary_matrix(self):
+        '''
+        Convert to sparse boundary matrix.
+
+        Simplices are passed on in terms of interned vertex ids, so no
+        labels need to be converted.
+        '''
+        boundary_matrix = SparseBoundaryMatrix()
+        for k in range(self.dimension+1):
+            k_simplices = self._get_vertex_ids(self.locate_k_simplices(k), k)
+            if k == 0:
+                k_simplices = k_simplices[:, 0]
+            if k_simplices.shape[0]:
+                boundary_matrix.add_simplices(k_simplices)
+
+        return boundary_matrix
+
+    def betti_numbers(self, reduced=False, **kwargs):
+        '''
+        Compute the betti numbers of the complex represented by self.
+
+        Parameters:
+        -----------
+        reduced : bool
+            Return reduced Betti numbers.
+        kwargs : dict
+            Keyword arguments passed on to
+            SparseBoundaryMatrix.compute_betti_numbers.
+        '''
+        if not len(self):
+            return []
+        boundary_matrix = self.boundary_matrix()
+        if reduced:
+            return boundary_matrix.get_reduced_betti_numbers(**kwargs)
+        return boundary_matrix.get_betti_numbers(**kwargs)
+
+    def euler_characteristic(self):
+        '''
+        Compute Euler characteristic of the complex represented by self.
+        '''
+        betti_numbers = self.betti_numbers()
+        return sum(betti_numbers[::2]) - sum(betti_numbers[1::2])
+
+    def __repr__(self):
+        res = 'ArraySimplexTree('
+        vertices = [
+            str(self._labels[self._node_labels.array[node]])
+            for node in self.locate_k_simplices(0)
+        ]
+        if len(vertices) > 5:
+            res += ','.join(vertices[:2])
+            res += ',...,'
+            res += ','.join(vertices[-2:])
+        else:
+            res += ','.join(vertices)
+        res += ')'
+        return res
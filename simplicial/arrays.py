@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class GrowableArray:
+    '''
+    An array which grows along its first axis.
+
+    Storage is over-allocated by doubling, so that appending n rows
+    costs amortized O(n) regardless of the current size.
+
+    Parameters:
+    -----------
+    values : array-like
+        Initial contents of the array.
+    dtype : data-type, optional (default=None)
+        Data type of the array. If None, inferred from values.
+    '''
+
+    def __init__(self, values, dtype=None):
+        values = np.asarray(values, dtype=dtype)
+        self._data = values.copy()
+        self._size = values.shape[0]
+
+    @property
+    def array(self):
+        '''
+        View of the filled part of the array.
+        '''
+        return self._data[:self._size]
+
+    @staticmethod
+    def _needs_promotion(values, dtype):
+        '''
+        Helper function for checking whether values can be stored in an
+        array of the given dtype. Integers are checked by value, so
+        that small indices stay in compact storage.
+        '''
+        if values.dtype == dtype or not values.size:
+            return False
+        if np.issubdtype(dtype, np.integer) and \
+                np.issubdtype(values.dtype, np.integer):
+            info = np.iinfo(dtype)
+            return values.min() < info.min or values.max() > info.max
+        return np.promote_types(dtype, values.dtype) != dtype
+
+    def extend(self, values):
+        '''
+        Append rows to the end of the array.
+        '''
+        values = np.asarray(values)
+        dtype = self._data.dtype
+        if self._needs_promotion(values, dtype):
+            dtype = np.promote_types(dtype, values.dtype)
+        size = self._size + values.shape[0]
+
+        if size > self._data.shape[0] or dtype != self._data.dtype:
+            capacity = max(size, 2 * self._data.shape[0], 16)
+            data = np.empty((capacity,) + self._data.shape[1:], dtype=dtype)
+            data[:self._size] = self.array
+            self._data = data
+
+        self._data[self._size:size] = values
+        self._size = size
@@ -1,11 +1,385 @@
+import os
 import warnings
 
 import numpy as np
 
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
-from scipy.sparse import csc_matrix, find
+from multiprocessing.shared_memory import SharedMemory
+from scipy.sparse import csc_matrix, find, issparse
+
+from simplicial.arrays import GrowableArray
+from simplicial.io import read_simplex_blocks
+from simplicial.reduction import (
+    boundary_edges, coboundary_arrays, cohomology_ranks, column_arrays,
+    four_russians_rank, reduce_columns, twist_ranks, union_find_rank
+)
+from simplicial.serialization import load_arrays, save_arrays
+from simplicial.store import read_store, write_store
+
+def _share_arrays(arrays):
+    '''
+    Copy arrays into shared memory blocks so that worker processes can
+    read them without pickling.
+
+    Returns:
+    --------
+    blocks : list[SharedMemory]
+        The shared memory blocks, which the caller must unlink.
+    specs : list[tuple]
+        Tuples (name, dtype, shape) from which the arrays can be
+        reattached with _attach_arrays.
+    '''
+    blocks, specs = [], []
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        block = SharedMemory(create=True, size=max(arr.nbytes, 1))
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=block.buf)
+        view[...] = arr
+        del view
+        blocks.append(block)
+        specs.append((block.name, arr.dtype.str, arr.shape))
+    return blocks, specs
+
+
+def _attach_arrays(specs):
+    '''
+    Attach to arrays placed in shared memory by _share_arrays.
+    '''
+    blocks, arrays = [], []
+    for name, dtype, shape in specs:
+        block = SharedMemory(name=name)
+        blocks.append(block)
+        arrays.append(np.ndarray(shape, dtype=dtype, buffer=block.buf))
+    return blocks, arrays
+
+
+def _reduce_shared(cls, specs, shape, method):
+    '''
+    Worker function reducing a single boundary matrix held in shared
+    memory.
+    '''
+    blocks, arrays = _attach_arrays(specs)
+    try:
+        mat = cls._from_arrays(arrays, shape)
+        ranks = cls()._reduce(mat, method=method)
+        del mat
+    finally:
+        # Views into the blocks must be released before closing them
+        del arrays
+        for block in blocks:
+            block.close()
+    return tuple(int(rank) for rank in ranks)
+
+
+def _parallel_reduce(cls, boundary_matrices, method, n_jobs):
+    '''
+    Reduce each boundary matrix in its own worker process.
+
+    Parameters:
+    -----------
+    cls : type
+        The boundary matrix class whose _reduce method is used.
+    boundary_matrices : dict
+        Dictionary mapping each dimension p to its boundary matrix.
+    method : str
+        Reduction method passed on to _reduce.
+    n_jobs : int
+        Number of worker processes. If negative, use all processors.
+
+    Returns:
+    --------
+    ranks : dict[int, tuple]
+        Dictionary mapping each dimension p to the ranks
+        (rank_zp, rank_bp_1) of its boundary matrix.
+    '''
+    if n_jobs < 0:
+        n_jobs = os.cpu_count()
+
+    blocks = []
+    futures = dict()
+    try:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for p, mat in boundary_matrices.items():
+                arrays = cls._to_arrays(mat)
+                p_blocks, specs = _share_arrays(arrays)
+                blocks.extend(p_blocks)
+                futures[p] = executor.submit(
+                    _reduce_shared, cls, specs, mat.shape, method
+                )
+            ranks = {p: future.result() for p, future in futures.items()}
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return ranks
+
+
+def _unique_rows(simplices):
+    '''
+    Helper function for getting the distinct simplices (rows) of an
+    array in lexicographic order, as np.unique(simplices, axis=0) does.
+    Rows are sorted one column at a time, which is faster than comparing
+    whole rows.
+    '''
+    simplices = np.asarray(simplices)
+    if len(simplices.shape) < 2:
+        return np.unique(simplices)
+
+    simplices = simplices[np.lexsort(simplices.T[::-1])]
+    distinct = np.ones(simplices.shape[0], dtype=bool)
+    distinct[1:] = (simplices[1:] != simplices[:-1]).any(axis=1)
+
+    return simplices[distinct]
+
+
+class _BoundaryMatrixBase:
+    '''
+    Base class for representations of a simplicial complex via its
+    boundary matrices, computing Betti numbers from the ranks of the
+    boundary matrices and caching the ranks of those left unchanged.
+
+    Subclasses reduce a single boundary matrix in _reduce, and list the
+    arrays backing one in _to_arrays and _from_arrays.
+    '''
+
+    def __init__(self):
+        self.boundary_matrices = dict()
+        self.betti_numbers = []
+
+        # Ranks (rank_zp, rank_bp_1) of each boundary matrix reduced
+        # since it last changed, and the generation of the complex at
+        # which the Betti numbers were last computed
+        self._ranks = dict()
+        self._generation = 0
+        self._betti_generation = None
+
+    def _mark_dirty(self, *dims):
+        '''
+        Helper function for recording that the boundary matrices of the
+        given dimensions have changed, so that their cached ranks and
+        the cached Betti numbers are no longer valid.
+        '''
+        for p in dims:
+            self._ranks.pop(p, None)
+        self._generation += 1
+
+    def remove_boundary_matrix(self, p):
+        '''
+        Remove the p-th boundary matrix from the simplicial complex.
+
+        Parameters:
+        -----------
+        p : int
+            Dimension of simplices to remove. No higher-dimensional
+            boundary matrix may be present.
+        '''
+        if (p + 1) in self.boundary_matrices:
+            raise ValueError(
+                'Boundary matrix has a higher-dimensional dependent.'
+            )
+        del self.boundary_matrices[p]
+        self._mark_dirty(p)
+
+    @staticmethod
+    def _vertex_rank(mat):
+        '''
+        Helper function for computing the rank of the 0th boundary
+        matrix, which is 1 if its single row has an odd entry and 0
+        otherwise. Returns None if the matrix has more than one row.
+        '''
+        if mat.shape[0] > 1:
+            return None
+        values = mat.data if issparse(mat) else np.asarray(mat)
+        return int(np.any(values % 2))
+
+    @staticmethod
+    def _graph_rank(mat):
+        '''
+        Helper function for computing the rank of the 1st boundary matrix
+        by union-find. Returns None if some column does not describe an
+        edge.
+        '''
+        try:
+            edges = boundary_edges(mat)
+        except ValueError:
+            return None
+        return union_find_rank(edges, mat.shape[0])
+
+    def _twist_ranks(self, dims):
+        '''
+        Helper function for computing the ranks of the boundary matrices
+        of the given dimensions by column reduction with clearing.
+        '''
+        matrices = dict()
+        for p in dims:
+            mat = self.boundary_matrices[p]
+            indptr, indices = column_arrays(mat)
+            matrices[p] = (indptr, indices, mat.shape[0])
+        return twist_ranks(matrices)
+
+    def _cohomology_ranks(self, dims):
+        '''
+        Helper function for computing the ranks of the boundary matrices
+        of the given dimensions by reducing their coboundary matrices
+        with clearing.
+        '''
+        matrices = dict()
+        for p in dims:
+            mat = self.boundary_matrices[p]
+            indptr, indices = coboundary_arrays(mat)
+            matrices[p] = (indptr, indices, mat.shape[1])
+        return cohomology_ranks(matrices)
+
+    def compute_betti_numbers(self, method='snf', n_jobs=None):
+        '''
+        Computes the Betti numbers of the simplicial complex.
+
+        Only boundary matrices which changed since they were last
+        reduced are reduced again; the ranks of the others are reused.
+        Neither the 0th boundary matrix, whose rank is read off its
+        single row, nor the 1st is ever reduced, as the rank of the 1st
+        follows from the connected components of the graph, found by
+        union-find. Cohomology reduction is the exception for the 1st,
+        as it clears the 2nd boundary matrix with the pivots of the 1st.
+
+        Parameters:
+        -----------
+        method : str, optional (default='snf')
+            Reduction used for each boundary matrix. See _reduce. May
+            also be 'twist', which reduces the matrices by columns from
+            the top dimension down, clearing columns that are known to
+            reduce to zero, or 'cohomology', which reduces the
+            coboundary matrices from the bottom dimension up with
+            clearing instead.
+        n_jobs : int, optional (default=None)
+            Number of worker processes across which the boundary
+            matrices are reduced, each one read from shared memory. If
+            negative, all processors are used. If None or 1, matrices
+            are reduced in the current process.
+
+        Returns:
+        --------
+        betti_numbers : list[int]
+            The Betti numbers of the complex.
+        '''
+        ranks_zp = np.array([])
+        ranks_bp_1 = np.array([])
+
+        parallel = n_jobs is not None and n_jobs != 1
+        clearing = method in ('twist', 'cohomology')
+        if clearing and parallel:
+            raise ValueError(
+                'Reduction with clearing depends on neighbouring '
+                'dimensions and cannot be run in parallel.'
+            )
+
+        dims = sorted(self.boundary_matrices)
+        dirty = [p for p in dims if p not in self._ranks]
+
+        # The rank of the 0th boundary matrix is read off its single row,
+        # and that of the 1st follows from the connected components of
+        # the graph, except that cohomology reduction needs its pivots
+        # for clearing
+        if 0 in dirty:
+            rank = self._vertex_rank(self.boundary_matrices[0])
+            if rank is not None:
+                self._ranks[0] = (
+                    self.boundary_matrices[0].shape[1] - rank, rank
+                )
+                dirty.remove(0)
+
+        if 1 in dirty and method != 'cohomology':
+            rank = self._graph_rank(self.boundary_matrices[1])
+            if rank is not None:
+                self._ranks[1] = (
+                    self.boundary_matrices[1].shape[1] - rank, rank
+                )
+                dirty.remove(1)
+
+        if method == 'twist':
+            ranks = self._twist_ranks(dirty)
+        elif method == 'cohomology':
+            ranks = self._cohomology_ranks(dirty)
+        elif parallel and dirty:
+            ranks = _parallel_reduce(
+                type(self),
+                {p: self.boundary_matrices[p] for p in dirty},
+                method,
+                n_jobs,
+            )
+
+        for p in dirty:
+            # Get the p-th boundary matrix
+            mat = self.boundary_matrices[p]
+            if clearing:
+                self._ranks[p] = (mat.shape[1] - ranks[p], ranks[p])
+            elif parallel:
+                self._ranks[p] = ranks[p]
+            else:
+                self._ranks[p] = self._reduce(mat, method=method)
+
+        for p in dims:
+            rank_zp, rank_bp_1 = self._ranks[p]
+            ranks_zp = np.append(ranks_zp, rank_zp)
+            ranks_bp_1 = np.append(ranks_bp_1, rank_bp_1)
+
+        # Add padding for roll
+        ranks_zp = np.append(ranks_zp, 0)
+        ranks_bp_1 = np.append(ranks_bp_1, 0)
+
+        # Shift lower-dimencional ranks into place
+        ranks_bp = np.roll(ranks_bp_1, -1)
+
+        # rankH_p = rankZ_p - rankB_p
+        betti = ranks_zp - ranks_bp
+        # Remove padding
+        betti = betti[:-1]
+        # Convert reduced Betti number to actual
+        betti[0] = betti[0] + 1
+
+        # Convert to list of integers
+        betti = list(betti.astype(int))
+
+        self.betti_numbers = betti
+        self._betti_generation = self._generation
+
+        return betti
+    
+    def get_betti_numbers(self, recompute=False, **kwargs):
+        if recompute:
+            self._ranks = dict()
+        if recompute or self._betti_generation != self._generation:
+            return self.compute_betti_numbers(**kwargs)
+        return self.betti_numbers
+    
+    '''
+    Reduced Betti numbers caputure the notion of a 0-dimensional "hole"
+    (i.e. gives 1 when there is a gap between two disconnected vertices)
+    '''
+    def get_reduced_betti_numbers(self, recompute=False, **kwargs):
+        # Copy, so that the cached Betti numbers are left intact
+        reduced = list(self.get_betti_numbers(recompute=recompute, **kwargs))
+
+        reduced[0] = reduced[0] - 1
+
+        return reduced
+    
+    '''
+    The Euler characteristic of a topological space can be given by the
+    alternating sum of its Betti numbers
+    '''
+    def euler_characteristic(self):
+        betti = self.get_betti_numbers()
+
+        pos = betti[::2]
+        neg = betti[1::2]
+
+        return sum(pos) - sum(neg)
+
 
-class BoundaryMatrix:
+class BoundaryMatrix(_BoundaryMatrixBase):
     '''
     Representation of a simplicial complex via its boundary matrices.
 
@@ -19,10 +393,6 @@ class BoundaryMatrix:
     of the boundary matrices.
     '''
 
-    def __init__(self):
-        self.boundary_matrices = dict()
-        self.betti_numbers = []
-    
     def add_boundary_matrix(self, dim, mat):
         '''
         Add a boundary matrix to the simplicial complex.
@@ -49,7 +419,21 @@ class BoundaryMatrix:
             raise ValueError('Boundary matrix dimension mismatch.')
         
         self.boundary_matrices[dim] = np.array(mat)
-    
+        self._mark_dirty(dim)
+
+    def to_store(self, directory):
+        '''
+        Write the boundary matrices of the complex to an on-disk store,
+        in sparse form. The store can be reopened, memory-mapped, with
+        SparseBoundaryMatrix.from_store.
+
+        Parameters:
+        -----------
+        directory : str or PathLike
+            Directory to write to.
+        '''
+        write_store(directory, self.boundary_matrices)
+
     def get_boundary_matrix(self, dim):
         return self.boundary_matrices[dim]
     
@@ -102,94 +486,233 @@ class BoundaryMatrix:
         
         return mat
     
-    # Compute Betti numbers by computing the SNF of each matrix
-    def compute_betti_numbers(self):
-        ranks_zp = np.array([])
-        ranks_bp_1 = np.array([])
+    def _reduce(self, mat, method='snf'):
+        '''
+        Reduce a boundary matrix and read off the ranks of its cycle
+        and boundary groups.
 
-        for p in self.boundary_matrices:
-            # Get the p-th boundary matrix
-            mat = self.boundary_matrices[p]
-            snf = self._smith_normal_form(mat)
-            
-            '''
-            The rank of Z_p is equivalent to the number of zero columns
-            in the Smith normal form of the p-th boundary matrix. The
-            rank of B_(p-1) is the number of non-zero rows in Smith
-            normal form of the p-th boundary_matrix.
-            '''
-            last_one_row = 0
-            first_zero_col = snf.shape[1]
-
-            one_rows = np.where(np.any(snf, axis=1))[0]
-            zero_cols = np.where(~np.any(snf, axis=0))[0]
-
-            if one_rows.size:
-                last_one_row = one_rows[-1]
-            if zero_cols.size:
-                first_zero_col = zero_cols[0]
-            
-            rank_zp = snf.shape[1] - first_zero_col
-            rank_bp_1 = last_one_row + 1
+        Parameters:
+        -----------
+        mat : ndarray
+            The p-th boundary matrix.
+        method : str, optional (default='snf')
+            Reduction to perform. One of:
+            - 'snf': Smith normal form over Z2.
+            - 'four_russians': Bit-packed rank computation using the
+              Method of Four Russians.
+            - 'column': Left-to-right column reduction using a pivot
+              lookup table.
 
-            ranks_zp = np.append(ranks_zp, rank_zp)
-            ranks_bp_1 = np.append(ranks_bp_1, rank_bp_1)
+        Returns:
+        --------
+        rank_zp : int
+            Rank of the p-th cycle group Z_p.
+        rank_bp_1 : int
+            Rank of the (p-1)-th boundary group B_(p-1).
+        '''
+        if method == 'four_russians':
+            rank = four_russians_rank(mat)
+            return mat.shape[1] - rank, rank
 
-        # Add padding for roll
-        ranks_zp = np.append(ranks_zp, 0)
-        ranks_bp_1 = np.append(ranks_bp_1, 0)
+        if method == 'column':
+            indptr, indices = column_arrays(mat)
+            pivots = reduce_columns(indptr, indices, mat.shape[0])
+            rank = int(np.count_nonzero(pivots >= 0))
+            return mat.shape[1] - rank, rank
 
-        # Shift lower-dimencional ranks into place
-        ranks_bp = np.roll(ranks_bp_1, -1)
+        if method != 'snf':
+            raise ValueError(f'Unknown reduction method {method!r}.')
 
-        # rankH_p = rankZ_p - rankB_p
-        betti = ranks_zp - ranks_bp
-        # Remove padding
-        betti = betti[:-1]
-        # Convert reduced Betti number to actual
-        betti[0] = betti[0] + 1
+        snf = self._smith_normal_form(mat)
 
-        # Convert to list of integers
-        betti = list(betti.astype(int))
+        '''
+        The rank of Z_p is equivalent to the number of zero columns
+        in the Smith normal form of the p-th boundary matrix. The
+        rank of B_(p-1) is the number of non-zero rows in Smith
+        normal form of the p-th boundary_matrix.
+        '''
+        last_one_row = -1
+        first_zero_col = snf.shape[1]
 
-        self.betti_numbers = betti
+        one_rows = np.where(np.any(snf, axis=1))[0]
+        zero_cols = np.where(~np.any(snf, axis=0))[0]
 
-        return betti
-    
-    def get_betti_numbers(self, recompute=False):
-        if recompute or not self.betti_numbers:
-            return self.compute_betti_numbers()
-        return self.betti_numbers
-    
-    '''
-    Reduced Betti numbers caputure the notion of a 0-dimensional "hole"
-    (i.e. gives 1 when there is a gap between two disconnected vertices)
-    '''
-    def get_reduced_betti_numbers(self, recompute=False):
-        if recompute or not self.betti_numbers:
-            reduced = self.compute_betti_numbers()
-        else:
-            reduced = self.betti_numbers
+        if one_rows.size:
+            last_one_row = one_rows[-1]
+        if zero_cols.size:
+            first_zero_col = zero_cols[0]
+        
+        rank_zp = snf.shape[1] - first_zero_col
+        rank_bp_1 = last_one_row + 1
 
-        reduced[0] = reduced[0] - 1
+        return rank_zp, rank_bp_1
 
-        return reduced
-    
+    @staticmethod
+    def _to_arrays(mat):
+        '''
+        Helper function for listing the arrays backing a boundary matrix.
+        '''
+        return [np.asarray(mat)]
+
+    @staticmethod
+    def _from_arrays(arrays, shape):
+        '''
+        Helper function for rebuilding a boundary matrix from the arrays
+        given by _to_arrays.
+        '''
+        return arrays[0].reshape(shape)
+
+
+class _SimplexIndex:
     '''
-    The Euler characteristic of a topological space can be given by the
-    alternating sum of its Betti numbers
+    A helper class for locating simplices among the columns of a
+    boundary matrix.
+
+    Each simplex is turned into a single key, so that keys compare as
+    the simplices do lexicographically. Simplices of small non-negative
+    integers are packed into one 64-bit integer, which is much faster to
+    sort and search than a structured key of their vertices.
+
+    Keys are held as sorted runs, along with the column of each key, and
+    are located by binary search in every run. Each batch of new
+    simplices is sorted into a run of its own, and the newest runs are
+    merged until every run is more than twice as long as the next.
+    There are then O(log n) runs, and every simplex takes part in
+    O(log n) merges, so a batch of m simplices is added or located in
+    O(m log^2 n) amortized time, rather than by sorting all n simplices
+    again.
+
+    Parameters:
+    -----------
+    simplices : array-like, optional (default=None)
+        Initial simplices, in column order.
     '''
-    def euler_characteristic(self):
-        betti = self.get_betti_numbers()
 
-        pos = betti[::2]
-        neg = betti[1::2]
+    def __init__(self, simplices=None):
+        self._runs = []
+        self._size = 0
 
-        return sum(pos) - sum(neg)
+        # Data type of the simplices, and the number of bits per vertex
+        # in packed keys, or None if keys are structured
+        self._dtype = None
+        self._bits = 0
+
+        if simplices is not None:
+            self.add(simplices)
+
+    @staticmethod
+    def _bits_needed(rows, dtype):
+        '''
+        Helper function for getting the number of bits per vertex needed
+        to pack rows into 64-bit keys, or None if they cannot be packed.
+        '''
+        if not np.issubdtype(dtype, np.integer):
+            return None
+        if not rows.size:
+            return 0
+        if rows.min() < 0:
+            return None
+        bits = int(rows.max()).bit_length()
+        return bits if bits * rows.shape[1] < 64 else None
+
+    def _encode(self, rows):
+        '''
+        Helper function for getting the key of each row.
+        '''
+        rows = np.ascontiguousarray(rows, dtype=self._dtype)
+        if self._bits is None:
+            fields = [(f'v{i}', rows.dtype) for i in range(rows.shape[1])]
+            return rows.view(fields).reshape(rows.shape[0])
+
+        keys = np.zeros(rows.shape[0], dtype=np.uint64)
+        for i in range(rows.shape[1]):
+            keys <<= np.uint64(self._bits)
+            keys |= rows[:, i].astype(np.uint64)
+        return keys
+
+    def _decode(self, keys, width):
+        '''
+        Helper function for getting the rows of the given width back
+        from their keys.
+        '''
+        if self._bits is None:
+            return keys.view(self._dtype).reshape(-1, width)
+
+        rows = np.empty((keys.shape[0], width), dtype=self._dtype)
+        mask = np.uint64((1 << self._bits) - 1)
+        keys = keys.copy()
+        for i in reversed(range(width)):
+            rows[:, i] = keys & mask
+            keys >>= np.uint64(self._bits)
+        return rows
+
+    def _rows(self, simplices):
+        '''
+        Helper function for giving simplices as rows, widening the keys
+        of the index if they do not fit.
+        '''
+        simplices = np.asarray(simplices)
+        rows = simplices.reshape(-1, 1) if simplices.ndim < 2 else simplices
+
+        dtype = rows.dtype
+        if self._dtype is not None:
+            dtype = np.promote_types(self._dtype, dtype)
+        bits = self._bits_needed(rows, dtype)
+        if bits is not None and self._bits is not None:
+            bits = max(bits, self._bits)
+        else:
+            bits = None
+
+        if (dtype, bits) != (self._dtype, self._bits):
+            runs = [
+                (self._decode(keys, rows.shape[1]), columns)
+                for keys, columns in self._runs
+            ]
+            self._dtype, self._bits = dtype, bits
+            self._runs = [
+                (self._encode(run), columns) for run, columns in runs
+            ]
+
+        return rows
+
+    def add(self, simplices):
+        '''
+        Add simplices, which are given the next columns in order.
+        '''
+        keys = self._encode(self._rows(simplices))
+        if not keys.shape[0]:
+            return
+
+        order = np.argsort(keys, kind='stable')
+        self._runs.append((keys[order], self._size + order))
+        self._size += keys.shape[0]
+
+        while len(self._runs) > 1 and \
+                len(self._runs[-2][0]) <= 2 * len(self._runs[-1][0]):
+            keys, columns = self._runs.pop()
+            run, run_columns = self._runs.pop()
+            positions = np.searchsorted(run, keys)
+            self._runs.append((
+                np.insert(run, positions, keys),
+                np.insert(run_columns, positions, columns),
+            ))
+
+    def locate(self, simplices):
+        '''
+        Get the column of each simplex, or -1 if absent.
+        '''
+        query = self._encode(self._rows(simplices))
+        res = np.full(query.shape[0], -1)
+        for run, columns in self._runs:
+            positions = np.searchsorted(run, query)
+            positions = np.minimum(positions, run.shape[0] - 1)
+            found = run[positions] == query
+            res[found] = columns[positions[found]]
 
+        return res
 
 
-class SparseBoundaryMatrix:
+class SparseBoundaryMatrix(_BoundaryMatrixBase):
     '''
     Sparse matrix representation of a simplicial complex via its
     boundary matrices.
@@ -220,40 +743,31 @@ class SparseBoundaryMatrix:
     '''
 
     def __init__(self):
-        self.boundary_matrices = dict()
-        self.betti_numbers = []
+        super().__init__()
         self._index_maps = dict()
+        self._buffers = dict()
 
-    def _find_many(self, test_elements, elements):
-        '''
-        Get indices of all occurrences of values in a query array.
+        # Indexes for locating the simplices of each dimension, which
+        # are built on first use
+        self._indexes = dict()
 
-        Parameters:
-        -----------
-        test_elements : array
-            Array to search for values.
-        elements : array
-            Query array containing values to search for.
-        
-        Returns:
-        --------
-        res : array
-            Array of indices at which values of elements were found in
-            test_elements.
-        '''
-        test_elements = np.squeeze(test_elements)
-        if len(test_elements.shape) < 2:
-            return np.nonzero(elements[:, None] == test_elements)[1]
-        return np.where((elements[:, None] == test_elements).all(-1))[-1]
-    
     def _set_index_map(self, p, simplices):
         '''
         Helper function for setting index map arrays.
         '''
-        index_map = np.unique(simplices, axis=0)
+        index_map = _unique_rows(simplices)
         self._index_maps[p] = index_map
+        self._indexes.pop(p, None)
         return index_map
 
+    def _get_index(self, p):
+        '''
+        Helper function for getting the index of the p-simplices.
+        '''
+        if p not in self._indexes:
+            self._indexes[p] = _SimplexIndex(self._index_maps[p])
+        return self._indexes[p]
+
     def _get_indices(self, p, simplices):
         '''
         Helper function for getting indices of simplices in boundary
@@ -261,14 +775,15 @@ class SparseBoundaryMatrix:
         '''
         if p < 0:
             return np.zeros(simplices.shape[0]).astype(int)
-        return self._find_many(self._index_maps[p], simplices)
+        res = self._get_index(p).locate(simplices)
+        return res[res >= 0]
     
     def _expand_indices(self, p, indices):
         '''
         Helper function for repeating index values for simplices of
         dimension p.
         '''
-        return np.array([[i] * (p+1) for i in indices]).flatten()
+        return np.repeat(indices, p+1)
     
     def _get_simplices(self, p, indices):
         '''
@@ -280,26 +795,178 @@ class SparseBoundaryMatrix:
     def _get_cofaces(self, simplices):
         '''
         Helper function for getting all cofaces of simplices.
+
+        Faces are taken as views of the simplex array through the (p+1)
+        column-drop patterns of a p-simplex, listed in the order of
+        itertools.combinations, so that the faces of each simplex are
+        contiguous.
         '''
         if len(simplices.shape) < 2:
             return np.zeros_like(simplices)
         q = simplices.shape[1] - 1
-        cofaces = []
-        for s in simplices:
-            cofaces.extend(combinations(s, q))
-        cofaces = np.array(cofaces).squeeze()
+        patterns = np.array(list(combinations(range(q+1), q)))
+        cofaces = simplices[:, patterns].reshape(-1, q)
+        if q == 1:
+            cofaces = cofaces[:, 0]
 
         return cofaces
 
-    def add_simplices(self, simplices):
+    def _append_columns(self, p, simplices, q_indices):
+        '''
+        Helper function for appending p-simplices, given the row indices
+        of their faces, as new columns of the p-th boundary matrix.
+        '''
+        n = simplices.shape[0]
+
+        # Keep row indices sorted within each column
+        q_indices = np.sort(q_indices.reshape(n, p+1), axis=1).flatten()
+
+        if p not in self._buffers:
+            self._buffers[p] = {
+                'simplices': GrowableArray(simplices),
+                'indptr': GrowableArray(np.zeros(1), dtype=np.int32),
+                'indices': GrowableArray(q_indices, dtype=np.int32),
+                'data': GrowableArray(
+                    np.ones(q_indices.shape[0], dtype=np.int8)
+                ),
+            }
+        else:
+            self._buffers[p]['simplices'].extend(simplices)
+            self._buffers[p]['indices'].extend(q_indices)
+            self._buffers[p]['data'].extend(
+                np.ones(q_indices.shape[0], dtype=np.int8)
+            )
+        buffers = self._buffers[p]
+
+        nnz = buffers['indptr'].array[-1]
+        buffers['indptr'].extend(nnz + (p+1) * np.arange(1, n+1))
+
+        self._index_maps[p] = buffers['simplices'].array
+        self._update_matrix(p)
+
+    def _load_buffers(self, p):
+        '''
+        Helper function for copying the p-th boundary matrix and its
+        simplices into growable buffers, so that columns can be
+        appended.
+        '''
+        mat = self.boundary_matrices[p]
+        self._buffers[p] = {
+            'simplices': GrowableArray(self._index_maps[p]),
+            'indptr': GrowableArray(mat.indptr),
+            'indices': GrowableArray(mat.indices),
+            'data': GrowableArray(mat.data),
+        }
+
+    def _update_matrix(self, p):
+        '''
+        Helper function for viewing the buffers of the p-th boundary
+        matrix as a CSC matrix.
+        '''
+        buffers = self._buffers[p]
+        n_rows = 1 if p == 0 else self._index_maps[p-1].shape[0]
+        n_cols = self._index_maps[p].shape[0]
+
+        # Use CSC sparse matrix format for fast column lookup
+        self.boundary_matrices[p] = csc_matrix(
+            (
+                buffers['data'].array,
+                buffers['indices'].array,
+                buffers['indptr'].array,
+            ),
+            shape=(n_rows, n_cols),
+        )
+
+    def _resize_rows(self, p):
+        '''
+        Helper function for giving the p-th boundary matrix one row per
+        (p-1)-simplex, after (p-1)-simplices have been appended. The
+        matrix keeps its arrays, so one opened from a store or a saved
+        file is not copied.
+        '''
+        if p in self._buffers:
+            self._update_matrix(p)
+            return
+
+        mat = self.boundary_matrices[p]
+        self.boundary_matrices[p] = csc_matrix(
+            (mat.data, mat.indices, mat.indptr),
+            shape=(self._index_maps[p-1].shape[0], mat.shape[1]),
+        )
+
+    def add_boundary_matrix(self, p, mat, simplices=None):
+        '''
+        Add a boundary matrix to the simplicial complex directly, rather
+        than building it from a list of simplices.
+
+        Parameters:
+        -----------
+        p : int
+            Dimension of simplices described by matrix.
+        mat : sparse matrix or array-like
+            2D array describing boundary relations between simplices and
+            their faces.
+        simplices : array-like, optional (default=None)
+            The p-simplices indexing the columns of mat. Only needed if
+            simplices will later be appended in this dimension.
+        '''
+
+        # Need lower dimensional simplices to be defined before
+        # higher-dimensional simplies can be defined
+        if p > 0 and (p - 1) not in self.boundary_matrices:
+            raise ValueError(
+                'Boundary matrix has no lower-dimensional precedent.'
+            )
+
+        mat = csc_matrix(mat)
+
+        # Rows of p-th boundary matrix must match columns of (p-1)-th
+        # boundary matrix
+        if p > 0 and self.boundary_matrices[p-1].shape[1] != mat.shape[0]:
+            raise ValueError('Boundary matrix dimension mismatch.')
+
+        self._buffers.pop(p, None)
+        self._index_maps.pop(p, None)
+        self._indexes.pop(p, None)
+
+        self.boundary_matrices[p] = mat
+        if simplices is not None:
+            self._index_maps[p] = np.asarray(simplices)
+            self._load_buffers(p)
+        self._mark_dirty(p)
+
+    def remove_boundary_matrix(self, p):
+        '''
+        Remove the p-th boundary matrix from the simplicial complex,
+        along with its simplices.
+
+        Parameters:
+        -----------
+        p : int
+            Dimension of simplices to remove. No higher-dimensional
+            boundary matrix may be present.
+        '''
+        super().remove_boundary_matrix(p)
+        self._buffers.pop(p, None)
+        self._index_maps.pop(p, None)
+        self._indexes.pop(p, None)
+
+    def add_simplices(self, simplices, append=False):
         '''
         Adds simplices to complex. If simplices of similar dimension are
-        already present, these will be overwritten.
+        already present, these will be overwritten unless append is set.
 
         Parameters:
         -----------        
         simplices : ndarray-like
             List of simplices to add.
+        append : bool, optional (default=False)
+            If True, extend the simplices of similar dimension already
+            present instead of overwriting them. New simplices become
+            new columns of their boundary matrix and new rows of the
+            next one, and simplices already present are ignored. This
+            allows a complex to be added in batches. Boundary matrices
+            added without their simplices cannot be appended to.
         '''
         
         # Convert to numpy type if necessary
@@ -316,11 +983,29 @@ class SparseBoundaryMatrix:
                 'Boundary matrix has no lower-dimensional precedent.'
             )
         
-        self._set_index_map(p, simplices)
-        p_indices = np.unique(self._get_indices(p, simplices))
+        if append and p in self._index_maps:
+            # Simplices opened from a store are not held in buffers yet
+            if p not in self._buffers:
+                self._load_buffers(p)
+            simplices = _unique_rows(simplices)
+            index = self._get_index(p)
+            index_map = simplices[index.locate(simplices) < 0]
+            if not index_map.shape[0]:
+                return
+        elif append and p in self.boundary_matrices:
+            # Without its simplices, the columns of a boundary matrix
+            # cannot be told apart from new ones
+            raise ValueError('Boundary matrix has no simplices to append to.')
+        else:
+            self._buffers.pop(p, None)
+            index_map = self._set_index_map(p, simplices)
+            index = None
+
+        p_indices = np.arange(index_map.shape[0])
         p_indices = self._expand_indices(p, p_indices)
 
-        q_simplices = self._get_cofaces(simplices)
+        # Faces must be listed in the same order as p_indices
+        q_simplices = self._get_cofaces(index_map)
         q_indices = self._get_indices(p-1, q_simplices)
 
         if q_indices.shape[0] != p_indices.shape[0]:
@@ -328,9 +1013,180 @@ class SparseBoundaryMatrix:
                 'Boundary matrix dimension mismatch. Check triangulation.'
             )
 
-        # Use CSC sparse matrix format for fast column lookup
-        matrix = csc_matrix((np.ones_like(p_indices), (q_indices, p_indices)))
-        self.boundary_matrices[p] = matrix
+        # Index appended simplices only once their faces are found
+        if index is not None:
+            index.add(index_map)
+        self._append_columns(p, index_map, q_indices)
+
+        # New p-simplices add (empty) rows to the (p+1)-th matrix, which
+        # leaves its rank unchanged. Overwritten p-simplices invalidate
+        # its rows altogether.
+        if append and (p + 1) in self.boundary_matrices:
+            self._resize_rows(p+1)
+        if append:
+            self._mark_dirty(p)
+        else:
+            self._mark_dirty(p, p+1)
+
+    def to_store(self, directory):
+        '''
+        Write the boundary matrices and simplices of the complex to an
+        on-disk store. See simplicial.store.write_store.
+
+        Parameters:
+        -----------
+        directory : str or PathLike
+            Directory to write to.
+        '''
+        write_store(directory, self.boundary_matrices, self._index_maps)
+
+    @classmethod
+    def from_store(cls, directory, mmap=True):
+        '''
+        Open a complex from an on-disk store.
+
+        With mmap set, the stored arrays are memory-mapped rather than
+        read, so a complex opens almost instantly and need not fit in
+        memory. The 'column', 'twist' and 'cohomology' reduction methods
+        read the columns of the mapped matrices in place. Appending
+        simplices copies the affected dimension into memory.
+
+        Parameters:
+        -----------
+        directory : str or PathLike
+            Directory written by to_store.
+        mmap : bool, optional (default=True)
+            Memory-map the stored arrays instead of reading them.
+
+        Returns:
+        --------
+        boundary_matrix : SparseBoundaryMatrix
+            The stored complex.
+        '''
+        boundary_matrix = cls()
+        (
+            boundary_matrix.boundary_matrices,
+            boundary_matrix._index_maps,
+        ) = read_store(directory, mmap=mmap)
+        return boundary_matrix
+
+    def save(self, path):
+        '''
+        Save the complex to a single binary file, holding the CSC arrays
+        of each boundary matrix and the simplices indexing its columns.
+        See simplicial.serialization.save_arrays.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File to write.
+        '''
+        arrays = dict()
+        shapes = dict()
+        for p, mat in self.boundary_matrices.items():
+            mat = csc_matrix(mat)
+
+            # Keep both index arrays in one dtype, so that they can be
+            # used in place when loading
+            dtype = np.promote_types(mat.indices.dtype, mat.indptr.dtype)
+            arrays[f'{p}.indptr'] = mat.indptr.astype(dtype, copy=False)
+            arrays[f'{p}.indices'] = mat.indices.astype(dtype, copy=False)
+            arrays[f'{p}.data'] = mat.data.astype(np.int8, copy=False)
+            shapes[p] = list(mat.shape)
+            if p in self._index_maps:
+                arrays[f'{p}.simplices'] = self._index_maps[p]
+
+        save_arrays(path, arrays, metadata={'shapes': shapes})
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        '''
+        Load a complex saved by save. With mmap set, the boundary
+        matrices and simplices are views into the memory-mapped file, so
+        nothing is copied.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File to read.
+        mmap : bool, optional (default=True)
+            Memory-map the file instead of reading it.
+
+        Returns:
+        --------
+        boundary_matrix : SparseBoundaryMatrix
+            The saved complex.
+        '''
+        arrays, metadata = load_arrays(path, mmap=mmap)
+
+        boundary_matrix = cls()
+        shapes = {
+            int(p): tuple(shape) for p, shape in metadata['shapes'].items()
+        }
+        for p in sorted(shapes):
+            boundary_matrix.boundary_matrices[p] = csc_matrix(
+                (
+                    arrays[f'{p}.data'],
+                    arrays[f'{p}.indices'],
+                    arrays[f'{p}.indptr'],
+                ),
+                shape=shapes[p],
+            )
+            if f'{p}.simplices' in arrays:
+                boundary_matrix._index_maps[p] = arrays[f'{p}.simplices']
+
+        return boundary_matrix
+
+    def add_full_simplices(self, simplices):
+        '''
+        Adds simplices to the complex along with all of their faces,
+        appending to any simplices already present.
+
+        Parameters:
+        -----------
+        simplices : ndarray-like
+            Array of shape (n, k+1) listing n k-simplices, with the
+            vertices of each sorted in increasing order.
+        '''
+        simplices = np.asarray(simplices)
+        if simplices.ndim < 2:
+            simplices = simplices.reshape(-1, 1)
+
+        # Faces are added from the vertices up, as each dimension needs
+        # the one below it. Repeated faces are dropped by add_simplices.
+        width = simplices.shape[1]
+        for q in range(1, width + 1):
+            patterns = np.array(list(combinations(range(width), q)))
+            faces = simplices[:, patterns].reshape(-1, q)
+            if q == 1:
+                faces = faces[:, 0]
+            self.add_simplices(faces, append=True)
+
+    def add_full_simplices_from_file(self, path, chunk_size=65536,
+                                     progress=None):
+        '''
+        Adds the simplices listed in a text file, one per line, along
+        with all of their faces.
+
+        The file is streamed in chunks by
+        simplicial.io.read_simplex_blocks, and each block is appended
+        before the next is read, so memory use is bounded by the chunk
+        size and the size of the complex rather than that of the file.
+        Simplices already present are located through a sorted index of
+        each dimension, so the time taken by a chunk grows only
+        logarithmically with the size of the complex.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File listing simplices as integer vertex labels.
+        chunk_size : int, optional (default=65536)
+            Maximum number of lines read at once.
+        progress : callable, optional (default=None)
+            Called after each chunk as progress(bytes_read, bytes_total).
+        '''
+        for simplices in read_simplex_blocks(path, chunk_size, progress):
+            self.add_full_simplices(simplices)
 
     def get_boundary_matrix(self, p):
         '''
@@ -394,99 +1250,77 @@ class SparseBoundaryMatrix:
 
         return mat
     
-    def compute_betti_numbers(self):
+    def _reduce(self, mat, method='snf'):
         '''
-        Computes the Betti numbers of the simplicial complex.
-        
+        Reduce a sparse boundary matrix and read off the ranks of its
+        cycle and boundary groups.
+
+        Parameters:
+        -----------
+        mat : CSC sparse matrix
+            The p-th boundary matrix.
+        method : str, optional (default='snf')
+            Reduction to perform. One of:
+            - 'snf': Smith normal form over Z2.
+            - 'column': Left-to-right column reduction using a pivot
+              lookup table.
+
         Returns:
         --------
-        betti_numbers : list[int]
-            The Betti numbers of the complex.
+        rank_zp : int
+            Rank of the p-th cycle group Z_p.
+        rank_bp_1 : int
+            Rank of the (p-1)-th boundary group B_(p-1).
         '''
-        ranks_zp = np.array([])
-        ranks_bp_1 = np.array([])
-
-        for p in self.boundary_matrices:
-            # Get the p-th boundary matrix
-            mat = self.boundary_matrices[p]
+        if method == 'column':
+            indptr, indices = column_arrays(mat)
+            pivots = reduce_columns(indptr, indices, mat.shape[0])
+            rank = int(np.count_nonzero(pivots >= 0))
+            return mat.shape[1] - rank, rank
 
-            with warnings.catch_warnings():
-                # SciPy will warn us that csc access is slow, but the
-                # speedup in arithmetic outweighs this so we don't care
-                warnings.filterwarnings('ignore')
-                snf = self._sparse_snf(mat)
-            
-            '''
-            The rank of Z_p is equivalent to the number of zero columns
-            in the Smith normal form of the p-th boundary matrix. The
-            rank of B_(p-1) is the number of non-zerorows in Smith
-            normal form of the p-th boundary_matrix.
-            '''
-            last_one_row = 0
-            first_zero_col = snf.shape[1]
-
-            one_rows = find(snf.sum(axis=1).astype(bool))[0]
-            zero_cols = find(~snf.sum(axis=0).astype(bool))[1]
-
-            if one_rows.size:
-                last_one_row = one_rows[-1]
-            if zero_cols.size:
-                first_zero_col = zero_cols[0]
-            
-            rank_zp = snf.shape[1] - first_zero_col
-            rank_bp_1 = last_one_row + 1
+        if method != 'snf':
+            raise ValueError(f'Unknown reduction method {method!r}.')
 
-            ranks_zp = np.append(ranks_zp, rank_zp)
-            ranks_bp_1 = np.append(ranks_bp_1, rank_bp_1)
+        with warnings.catch_warnings():
+            # SciPy will warn us that csc access is slow, but the
+            # speedup in arithmetic outweighs this so we don't care
+            warnings.filterwarnings('ignore')
+            snf = self._sparse_snf(mat)
 
-        # Add padding for roll
-        ranks_zp = np.append(ranks_zp, 0)
-        ranks_bp_1 = np.append(ranks_bp_1, 0)
+        '''
+        The rank of Z_p is equivalent to the number of zero columns
+        in the Smith normal form of the p-th boundary matrix. The
+        rank of B_(p-1) is the number of non-zerorows in Smith
+        normal form of the p-th boundary_matrix.
+        '''
+        last_one_row = -1
+        first_zero_col = snf.shape[1]
 
-        # Shift lower-dimencional ranks into place
-        ranks_bp = np.roll(ranks_bp_1, -1)
+        one_rows = find(snf.sum(axis=1).astype(bool))[0]
+        zero_cols = find(~snf.sum(axis=0).astype(bool))[1]
 
-        # rankH_p = rankZ_p - rankB_p
-        reduced_numbers = ranks_zp - ranks_bp
-        # Remove padding
-        betti_numbers = reduced_numbers[:-1]
-        # Convert reduced Betti number to actual
-        betti_numbers[0] = reduced_numbers[0] + 1
+        if one_rows.size:
+            last_one_row = one_rows[-1]
+        if zero_cols.size:
+            first_zero_col = zero_cols[0]
 
-        # Convert to list of integers
-        betti_numbers = list(betti_numbers.astype(int))
+        rank_zp = snf.shape[1] - first_zero_col
+        rank_bp_1 = last_one_row + 1
 
-        self.betti_numbers = betti_numbers
+        return rank_zp, rank_bp_1
 
-        return betti_numbers
-    
-    def get_betti_numbers(self, recompute=False):
-        if recompute or not self.betti_numbers:
-            return self.compute_betti_numbers()
-        return self.betti_numbers
-    
-    '''
-    Reduced Betti numbers caputure the notion of a 0-dimensional "hole"
-    (i.e. gives 1 when there is a gap between two disconnected vertices)
-    '''
-    def get_reduced_betti_numbers(self, recompute=False):
-        if recompute or not self.betti_numbers:
-            reduced = self.compute_betti_numbers()
-        else:
-            reduced = self.betti_numbers
-
-        reduced[0] = reduced[0] - 1
-
-        return reduced
-    
-    '''
-    The Euler characteristic of a topological space can be given by the
-    alternating sum of its Betti numbers
-    '''
-    def euler_characteristic(self):
-        betti = self.get_betti_numbers()
-
-        pos = betti[::2]
-        neg = betti[1::2]
+    @staticmethod
+    def _to_arrays(mat):
+        '''
+        Helper function for listing the arrays backing a boundary matrix.
+        '''
+        mat = csc_matrix(mat)
+        return [mat.data, mat.indices, mat.indptr]
 
-        return sum(pos) - sum(neg)
\ No newline at end of file
+    @staticmethod
+    def _from_arrays(arrays, shape):
+        '''
+        Helper function for rebuilding a boundary matrix from the arrays
+        given by _to_arrays.
+        '''
+        return csc_matrix(tuple(arrays), shape=shape)
@@ -0,0 +1,108 @@
+class IncrementalHomology:
+    '''
+    Online tracker of the Betti numbers of a simplicial complex over Z2,
+    as simplices are added one at a time.
+
+    Each new p-simplex is given a position in the order of insertion,
+    and its boundary is reduced against the reduced boundaries of the
+    earlier p-simplices, exactly as in the column reduction algorithm.
+    If it reduces to zero, the simplex closes a new p-cycle and
+    increases the p-th Betti number. Otherwise its lowest face, which
+    opened a (p-1)-cycle, is paired with it, and the (p-1)-th Betti
+    number decreases. Either way only the reduced column of the new
+    simplex is touched.
+
+    Simplices must be added after all of their faces. Removing simplices
+    invalidates the reduction of their dimension and all higher ones,
+    which must then be cleared and added again.
+
+    Source: Edelsbrunner, Letscher & Zomorodian - "Topological
+    Persistence and Simplification"
+    '''
+
+    def __init__(self):
+        self._clock = 0
+
+        # Position of each simplex in the order of insertion, the
+        # reduced boundary of each p-simplex keyed by its lowest face,
+        # and the number of p-simplices that created or killed a class
+        self._order = dict()
+        self._pivots = dict()
+        self._n_positive = dict()
+        self._n_negative = dict()
+
+    def add(self, simplex, facets):
+        '''
+        Add a simplex to the complex and update the Betti numbers.
+
+        Parameters:
+        -----------
+        simplex : Hashable
+            The new simplex.
+        facets : list[Hashable]
+            The facets of the simplex, all of which have already been
+            added. Empty for vertices.
+
+        Returns:
+        --------
+        positive : bool
+            True if the simplex created a new cycle, False if it killed
+            one.
+        '''
+        p = max(len(facets) - 1, 0)
+        order = self._order.setdefault(p, dict())
+        pivots = self._pivots.setdefault(p, dict())
+
+        faces = self._order.get(p - 1, dict())
+        column = set(faces[facet] for facet in facets)
+
+        while column:
+            low = max(column)
+            if low not in pivots:
+                break
+            column ^= pivots[low]
+
+        order[simplex] = self._clock
+        self._clock += 1
+
+        if column:
+            pivots[max(column)] = column
+            self._n_negative[p] = self._n_negative.get(p, 0) + 1
+            return False
+
+        self._n_positive[p] = self._n_positive.get(p, 0) + 1
+        return True
+
+    def clear(self, p):
+        '''
+        Forget all simplices of dimension p and higher.
+
+        Parameters:
+        -----------
+        p : int
+            Lowest dimension to forget.
+        '''
+        for tracked in (
+            self._order, self._pivots, self._n_positive, self._n_negative
+        ):
+            for q in [q for q in tracked if q >= p]:
+                del tracked[q]
+
+    def betti_numbers(self):
+        '''
+        Betti numbers of the complex added so far.
+
+        Returns:
+        --------
+        betti_numbers : list[int]
+            The p-th Betti number is the number of p-simplices that
+            created a class, less the number of (p+1)-simplices that
+            killed one.
+        '''
+        dims = [p for p, order in self._order.items() if order]
+        if not dims:
+            return []
+        return [
+            self._n_positive.get(p, 0) - self._n_negative.get(p+1, 0)
+            for p in range(max(dims) + 1)
+        ]
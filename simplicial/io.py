@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+
+
+def read_simplex_blocks(path, chunk_size=65536, progress=None):
+    '''
+    Read a text file listing one simplex per line, as integer vertex
+    labels separated by whitespace or commas, in blocks of bounded
+    size.
+
+    Lines are read chunk_size at a time, and each chunk is parsed into
+    one integer array per simplex dimension present in it, so that only
+    a single chunk is ever held in memory. Blank lines and lines
+    starting with '#' are skipped.
+
+    Parameters:
+    -----------
+    path : str or PathLike
+        File to read.
+    chunk_size : int, optional (default=65536)
+        Maximum number of lines parsed at once.
+    progress : callable, optional (default=None)
+        Called after each chunk as progress(bytes_read, bytes_total).
+
+    Yields:
+    -------
+    simplices : ndarray
+        Array of shape (n, k+1) holding n k-simplices, with the vertices
+        of each sorted in increasing order.
+    '''
+    total = os.path.getsize(path)
+    bytes_read = 0
+    reported = None
+
+    with open(path, 'rb') as f:
+        while True:
+            chunk = []
+            for line in f:
+                bytes_read += len(line)
+                line = line.strip()
+                if line and not line.startswith(b'#'):
+                    chunk.append(line.replace(b',', b' ').split())
+                if len(chunk) == chunk_size:
+                    break
+
+            if not chunk:
+                break
+
+            # Group the simplices of the chunk by number of vertices
+            blocks = dict()
+            for simplex in chunk:
+                blocks.setdefault(len(simplex), []).append(simplex)
+
+            for width in sorted(blocks):
+                simplices = np.array(blocks[width], dtype=np.int64)
+                yield np.sort(simplices, axis=1)
+
+            if progress is not None:
+                progress(bytes_read, total)
+                reported = bytes_read
+
+    # Account for any trailing lines with no simplices
+    if progress is not None and reported != bytes_read:
+        progress(bytes_read, total)
@@ -0,0 +1,139 @@
+import heapq
+
+import numpy as np
+
+from collections import deque
+
+
+def acyclic_matching(facets):
+    '''
+    Compute an acyclic matching on the cells of a complex by greedy
+    coreduction.
+
+    A cell whose boundary, among the cells not yet removed, consists of
+    a single face is removed together with that face as a matched pair.
+    When no such cell is left, a cell whose faces have all been removed
+    is removed on its own as a critical cell, and the search resumes
+    from its cofaces. Every face of a matched cell other than its
+    partner is removed before the pair, which makes the matching
+    acyclic.
+
+    Source: Mrozek & Batko - "Coreduction homology algorithm"
+
+    Parameters:
+    -----------
+    facets : list[list[int]]
+        Indices of the facets of each cell. Vertices have no facets.
+
+    Returns:
+    --------
+    partners : ndarray
+        The cell matched with each cell, or -1 if the cell is critical.
+    times : ndarray
+        The step at which each cell was removed. Each cell in a pair is
+        removed before its coface.
+    '''
+    n_cells = len(facets)
+
+    cofacets = [[] for _ in range(n_cells)]
+    for i, cell_facets in enumerate(facets):
+        for facet in cell_facets:
+            cofacets[facet].append(i)
+
+    # Plain lists are faster than arrays for element-wise updates
+    counts = [len(cell_facets) for cell_facets in facets]
+    removed = [False] * n_cells
+    partners = [-1] * n_cells
+    times = [0] * n_cells
+
+    # Cells left with one face, and cells left with none
+    queue = deque()
+    free = [i for i in reversed(range(n_cells)) if counts[i] == 0]
+
+    clock = 0
+
+    def remove(i):
+        nonlocal clock
+        removed[i] = True
+        times[i] = clock
+        clock += 1
+        for coface in cofacets[i]:
+            if removed[coface]:
+                continue
+            counts[coface] -= 1
+            if counts[coface] == 1:
+                queue.append(coface)
+            elif counts[coface] == 0:
+                free.append(coface)
+
+    while True:
+        while queue:
+            cell = queue.popleft()
+            if removed[cell] or counts[cell] != 1:
+                continue
+            face = next(f for f in facets[cell] if not removed[f])
+            partners[cell], partners[face] = face, cell
+            remove(face)
+            remove(cell)
+
+        while free and removed[free[-1]]:
+            free.pop()
+        if not free:
+            break
+        remove(free.pop())
+
+    return np.array(partners, dtype=np.int64), np.array(times, dtype=np.int64)
+
+
+def morse_boundary(cell, facets, dims, partners, times):
+    '''
+    Compute the boundary of a critical cell in the Morse complex of an
+    acyclic matching, over Z2.
+
+    Starting from the boundary of the cell, any face matched with a
+    cell of one dimension higher is replaced by the other faces of that
+    cell, following every gradient path at once. Faces are followed in
+    decreasing order of removal time, so each one is visited at most
+    once. Faces matched with a cell of one dimension lower start no
+    gradient paths and are dropped.
+
+    Source: Forman - "Morse theory for cell complexes"
+
+    Parameters:
+    -----------
+    cell : int
+        Index of a critical cell.
+    facets : list[list[int]]
+        Indices of the facets of each cell, as passed to
+        acyclic_matching.
+    dims : array-like
+        Dimension of each cell.
+    partners, times : ndarray
+        The matching, as returned by acyclic_matching.
+
+    Returns:
+    --------
+    boundary : list[int]
+        Sorted indices of the critical cells in the Morse boundary.
+    '''
+    def is_lower(face):
+        partner = partners[face]
+        return partner >= 0 and dims[partner] > dims[face]
+
+    chain = set(facets[cell])
+    heap = [(-times[face], face) for face in chain if is_lower(face)]
+    heapq.heapify(heap)
+
+    while heap:
+        _, face = heapq.heappop(heap)
+        if face not in chain:
+            continue
+        for other in facets[partners[face]]:
+            if other in chain:
+                chain.remove(other)
+            else:
+                chain.add(other)
+                if is_lower(other):
+                    heapq.heappush(heap, (-times[other], other))
+
+    return sorted(face for face in chain if partners[face] < 0)
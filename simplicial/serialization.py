@@ -0,0 +1,114 @@
+import json
+
+import numpy as np
+
+# Leading bytes of every file written by save_arrays
+MAGIC = b'SIMPLCX\x01'
+
+# Alignment of the header and of each array within the file
+ALIGNMENT = 64
+
+
+def _aligned(offset):
+    '''
+    Helper function for rounding an offset up to the array alignment.
+    '''
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def save_arrays(path, arrays, metadata=None):
+    '''
+    Save arrays to a single flat binary file.
+
+    The file starts with a magic number and the length of a JSON header,
+    which lists the dtype, shape and offset of every array along with
+    any metadata. The raw array contents follow, each aligned to 64
+    bytes, so that they can be viewed in place when loading.
+
+    Parameters:
+    -----------
+    path : str or PathLike
+        File to write.
+    arrays : dict[str, ndarray]
+        Arrays to save, by name. Arrays of Python objects are not
+        supported.
+    metadata : dict, optional (default=None)
+        JSON-serializable metadata to save alongside the arrays.
+    '''
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    for name, a in arrays.items():
+        if a.dtype.hasobject:
+            raise ValueError(f'Cannot save array {name!r} of objects.')
+
+    # Offsets are relative to the end of the header
+    entries = dict()
+    offset = 0
+    for name, a in arrays.items():
+        entries[name] = {
+            'dtype': a.dtype.str,
+            'shape': list(a.shape),
+            'offset': offset,
+        }
+        offset = _aligned(offset + a.nbytes)
+
+    header = json.dumps({
+        'metadata': metadata if metadata is not None else dict(),
+        'arrays': entries,
+    }).encode()
+    start = _aligned(len(MAGIC) + 8 + len(header))
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(np.uint64(len(header)).tobytes())
+        f.write(header)
+        for name, a in arrays.items():
+            f.seek(start + entries[name]['offset'])
+            f.write(a.data)
+        f.truncate(start + offset)
+
+
+def load_arrays(path, mmap=True):
+    '''
+    Load arrays from a file written by save_arrays.
+
+    Parameters:
+    -----------
+    path : str or PathLike
+        File to read.
+    mmap : bool, optional (default=True)
+        If True, the file is memory-mapped read-only and every array is
+        a view into it, so nothing is copied until it is accessed.
+        Otherwise the file is read into memory first.
+
+    Returns:
+    --------
+    arrays : dict[str, ndarray]
+        The saved arrays, by name.
+    metadata : dict
+        The saved metadata.
+    '''
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+
+    if bytes(buffer[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f'{path} is not a saved complex.')
+
+    header_start = len(MAGIC) + 8
+    header_length = int(buffer[len(MAGIC):header_start].view(np.uint64)[0])
+    header = json.loads(
+        bytes(buffer[header_start:header_start + header_length])
+    )
+    start = _aligned(header_start + header_length)
+
+    arrays = dict()
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        offset = start + entry['offset']
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        array = buffer[offset:offset + nbytes].view(dtype)
+        arrays[name] = array.reshape(shape)
+
+    return arrays, header['metadata']
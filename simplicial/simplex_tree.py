@@ -1,4 +1,16 @@
+import numpy as np
+
+from collections import deque
+from scipy.sparse import csc_matrix
+
 from simplicial.boundary_matrix import SparseBoundaryMatrix
+from simplicial.incremental import IncrementalHomology
+from simplicial.io import read_simplex_blocks
+from simplicial.morse import acyclic_matching, morse_boundary
+from simplicial.reduction import (
+    column_arrays, reduce_columns, union_find_rank
+)
+from simplicial.serialization import load_arrays, save_arrays
 
 class SimplexNode:
     '''
@@ -17,6 +29,8 @@ class SimplexNode:
 
         If None, initializes as an empty dict. This should only stay
         empty for leaf nodes in the tree.
+    filtration : float, optional (default=0.0)
+        Filtration value at which the simplex enters the complex.
     
     Attributes:
     -----------
@@ -26,16 +40,20 @@ class SimplexNode:
         Dimension of the simplex stored at this node.
     linked_node : SimplexNode
         Pointer to the next node in a circular linked list of all nodes
-        in the SimplexTree which share depth and label with self.
+        in the SimplexTree which share depth and label with self. This
+        list is maintained by the SimplexTree, and a new node starts
+        out linked only to itself.
     '''
     
-    def __init__(self, label=None, parent=None, children=None):
+    def __init__(self, label=None, parent=None, children=None,
+                 filtration=0.0):
         self.label = label
         self.parent = parent
         self.children = children if children is not None else dict()
+        self.filtration = filtration
 
         self.depth = self._initialize_depth()
-        self.linked_node = self._initialize_linked_node()
+        self.linked_node = self
 
         pass
 
@@ -44,34 +62,6 @@ class SimplexNode:
         Computes the depth of self within the Simplex Tree.
         '''
         return 0 if self.parent is None else (self.parent.depth+1)
-    
-    def _initialize_linked_node(self):
-        '''
-        Obtains a pointer to the next node in a circular linked list of
-        all nodes at the same depth as self with a shared label.
-        '''
-        root = self
-        while root.parent is not None:
-            root = root.parent
-        
-        to_visit = [root]
-        while to_visit:
-            node = to_visit.pop(0)
-            to_visit.extend(node.children.values())
-            if node.depth != self.depth or node is self:
-                continue
-            if node.label == self.label:
-                # Using any viable node as an entry point, get the linked list
-                all_linked_nodes = node.get_linked_nodes()
-                last_linked_node = all_linked_nodes[-1]
-
-                # Point the last linked node to self
-                last_linked_node.linked_node = self
-                
-                # Point self to the first linked node (close the list)
-                return node
-        
-        return self
         
     def get_vertex_list(self, safe=False):
         if self.parent is None:
@@ -126,6 +116,14 @@ class SimplexTree:
     originally introduced by Boissonnat and Maria in the paper:
     https://arxiv.org/pdf/2001.02581
 
+    Parameters:
+    -----------
+    track_homology : bool, optional (default=False)
+        If True, keep the Betti numbers up to date with an
+        IncrementalHomology tracker as simplices are inserted, so that
+        betti_numbers builds no boundary matrices. Removing a p-simplex
+        recomputes the tracker from dimension p up.
+
     Attributes:
     -----------
     root : SimplexNode
@@ -137,29 +135,172 @@ class SimplexTree:
 
     '''
     
-    def __init__(self):
+    def __init__(self, track_homology=False):
         
         self.root = SimplexNode()
         self.dimension = -1
 
+        # Entry point into the circular linked list of nodes sharing
+        # each (depth, label) pair
+        self._linked_nodes = dict()
+
+        # Registry of the nodes of each dimension, kept as dictionaries
+        # with no values so that they behave as insertion-ordered sets
+        self._k_simplices = dict()
+
+        # Boundary matrices from the last call to
+        # _cached_boundary_matrix, the dimensions whose matrices have
+        # changed since, and a counter of changes to the complex
+        self._boundary_matrix = None
+        self._dirty = set()
+        self._generation = 0
+
+        # Morse boundary matrices, with the generation they were built at
+        self._morse_matrix = (None, None)
+
+        # Homology tracker, with the nodes created since it was last
+        # updated and the lowest dimension of any node removed since
+        self._homology = IncrementalHomology() if track_homology else None
+        self._new_nodes = []
+        self._removed_dim = None
+
         pass
 
-    def _get_subtree_height(self, node=None):
-        if node is None:
-            node = self.root
-        
-        if not node.children:
-            return 0
-        
-        child_heights = [
-            self._get_subtree_height(c) for c in node.children.values()
-        ]
+    def _mark_dirty(self, k):
+        '''
+        Record that a k-simplex was created or removed. This changes the
+        columns of the k-th boundary matrix and the rows of the
+        (k+1)-th, so both must be rebuilt.
+        '''
+        self._dirty.update((k, k+1))
+        self._generation += 1
+
+    def _update_homology(self):
+        '''
+        Bring the homology tracker up to date. New nodes are added from
+        the lowest dimension up, so that their facets are always known.
+
+        Only insertion is local. The reduced columns of later simplices
+        may depend on any removed simplex, so after a removal every
+        dimension from the lowest one affected is cleared and added
+        again. Removing a vertex therefore recomputes the homology of
+        the whole complex, at the cost of a full column reduction.
+        '''
+        new_nodes = sorted(self._new_nodes, key=lambda node: node.depth)
+        self._new_nodes = []
+
+        p = self._removed_dim
+        self._removed_dim = None
+        if p is not None:
+            self._homology.clear(p)
+            new_nodes = [node for node in new_nodes if node.depth - 1 < p]
+            new_nodes.extend(
+                node
+                for k in range(p, self.dimension+1)
+                for node in self.locate_k_simplices(k)
+            )
+
+        for node in new_nodes:
+            facets = self._get_facets(node) if node.depth > 1 else []
+            self._homology.add(node, facets)
+
+    def _create_node(self, label, parent, filtration=0.0):
+        '''
+        Create a child node of parent with the given label, and attach
+        it to the linked list of nodes sharing its depth and label.
+
+        Parameters:
+        -----------
+        label : Any
+            Label of the new node.
+        parent : SimplexNode
+            Parent of the new node.
+        filtration : float, optional (default=0.0)
+            Filtration value of the new node.
+
+        Returns:
+        --------
+        node : SimplexNode
+            The new node.
+        '''
+        node = SimplexNode(label=label, parent=parent, filtration=filtration)
+        parent.children[label] = node
+
+        self._k_simplices.setdefault(node.depth - 1, dict())[node] = None
+        if node.depth - 1 > self.dimension:
+            self.dimension = node.depth - 1
+        self._mark_dirty(node.depth - 1)
+        if self._homology is not None:
+            self._new_nodes.append(node)
+
+        key = (node.depth, label)
+        entry = self._linked_nodes.get(key)
+        if entry is None:
+            self._linked_nodes[key] = node
+        else:
+            # Splice the new node in directly after the entry point
+            node.linked_node = entry.linked_node
+            entry.linked_node = node
+
+        return node
+
+    def _remove_node(self, node):
+        '''
+        Detach a node from its parent and from the linked list of nodes
+        sharing its depth and label.
+
+        Parameters:
+        -----------
+        node : SimplexNode
+            The node to remove.
+        '''
+        node.parent.children.pop(node.label, None)
+        self._k_simplices[node.depth - 1].pop(node, None)
+        self._mark_dirty(node.depth - 1)
+        if self._homology is not None:
+            removed_dim = node.depth - 1
+            if self._removed_dim is not None:
+                removed_dim = min(removed_dim, self._removed_dim)
+            self._removed_dim = removed_dim
+
+        # Drop the dimension past any top dimensions left empty
+        while self.dimension >= 0 and not self._k_simplices[self.dimension]:
+            self.dimension -= 1
+
+        key = (node.depth, node.label)
+        if node.linked_node is node:
+            if self._linked_nodes.get(key) is node:
+                del self._linked_nodes[key]
+            return
+
+        previous = node.linked_node
+        while previous.linked_node is not node:
+            previous = previous.linked_node
+        previous.linked_node = node.linked_node
+
+        if self._linked_nodes[key] is node:
+            self._linked_nodes[key] = node.linked_node
+        node.linked_node = node
 
-        return max(child_heights) + 1
-    
     def get_dimension(self):
-        return self._get_subtree_height() - 1
-    
+        '''
+        Dimension of the complex, which is kept up to date as simplices
+        are inserted and removed.
+        '''
+        return self.dimension
+
+    def f_vector(self):
+        '''
+        Count the simplices of each dimension in the complex.
+
+        Returns:
+        --------
+        f_vector : list[int]
+            List whose k-th entry is the number of k-simplices in the
+            complex, for k up to the dimension of the complex.
+        '''
+        return [len(self._k_simplices[k]) for k in range(self.dimension+1)]
+
     def search_simplex(self, *simplex, from_node=None):
         '''
         Find a simplex in the simplex tree and return its node. If not
@@ -188,7 +329,7 @@ class SimplexTree:
         
         return node
 
-    def insert_simplex(self, *simplex):
+    def insert_simplex(self, *simplex, filtration=0.0):
         '''
         Insert a simplex into the SimplexTree.
 
@@ -199,6 +340,11 @@ class SimplexTree:
         -----------
         simplex :  list[Any]
             Simplex given as an enumeration of its vertices.
+        filtration : float, optional (default=0.0)
+            Filtration value of the simplex. If the simplex is already
+            present, its filtration value is lowered to this if needed.
+            May not be lower than that of any facet of the simplex, so
+            that every simplex enters the filtration after its faces.
         '''
 
         simplex_partial = simplex[:-1]
@@ -206,32 +352,58 @@ class SimplexTree:
 
         if node is None:
             raise ValueError(f'Simplex {simplex_partial} is not in complex.')
+
+        if filtration < self._facet_filtration(*simplex):
+            raise ValueError(
+                f'Filtration value of simplex {simplex} is lower than that '
+                'of one of its facets.'
+            )
         
         last = simplex[-1]
         if last in node.children:
             # Simplex already exists
+            child = node.children[last]
+            child.filtration = min(child.filtration, filtration)
             return
         
-        new_node = SimplexNode(
-            label=last,
-            parent=node,
-        )
-        node.children[last] = new_node
-
-        if len(simplex) >  self.dimension + 1:
-            self.dimension = len(simplex) - 1
+        self._create_node(last, node, filtration=filtration)
         
         return
     
-    def insert_simplices(self, simplices):
-        for simplex in simplices:
-            self.insert_simplex(*simplex)
+    def _facet_filtration(self, *simplex):
+        '''
+        Helper function for getting the highest filtration value of any
+        facet of a simplex present in the SimplexTree, or -inf if none
+        are.
+        '''
+        if len(simplex) < 2:
+            return -np.inf
+        facets = [
+            self.search_simplex(*simplex[:i], *simplex[i+1:])
+            for i in range(len(simplex))
+        ]
+        return max(
+            (facet.filtration for facet in facets if facet is not None),
+            default=-np.inf,
+        )
+
+    def insert_simplices(self, simplices, filtrations=None):
+        if filtrations is None:
+            filtrations = [0.0] * len(simplices)
+        for simplex, filtration in zip(simplices, filtrations):
+            self.insert_simplex(*simplex, filtration=filtration)
     
-    def _insert_full_simplex(self, *simplex, node=None):
+    def _insert_full_simplex(self, *simplex, node=None, filtration=0.0):
         '''
         Helper function for simplex insertion. Inserts the simplex into
         the SimplexTree at the given node, creating new nodes and
         recursing as needed.
+
+        Each call below a node inserts every subset of the remaining
+        vertices, so every face is visited exactly once. If the largest
+        of those faces is already present, no later than the given
+        filtration value, then so are all of its faces, and the whole
+        subtree is skipped.
         
         Parameters:
         -----------
@@ -239,30 +411,30 @@ class SimplexTree:
             Simplex given as an enumeration of its vertices.
         node : SimplexNode
             The SimplexNode object at which to insert the given simplex.
+        filtration : float, optional (default=0.0)
+            Filtration value of the simplex and any new faces.
         '''
         if node is None:
             node = self.root
         
         for i, vertex in enumerate(simplex):
-            if vertex not in node.children:
-                new_node = SimplexNode(
-                    label=vertex,
-                    parent=node
-                )
-                node.children[vertex] = new_node
-                self._insert_full_simplex(*simplex[i+1:], node=new_node)
+            suffix = simplex[i+1:]
+            child = node.children.get(vertex)
+            if child is None:
+                child = self._create_node(vertex, node, filtration=filtration)
             else:
-                self._insert_full_simplex(
-                    *simplex[i+1:],
-                    node=node.children[vertex]
-                )
-        
-        if len(simplex) >  self.dimension + 1:
-            self.dimension = len(simplex) - 1
+                largest = self.search_simplex(*suffix, from_node=child)
+                if largest is not None and largest.filtration <= filtration:
+                    # The largest face below child exists, hence all of them
+                    continue
+                child.filtration = min(child.filtration, filtration)
+            self._insert_full_simplex(
+                *suffix, node=child, filtration=filtration
+            )
         
         return
     
-    def insert_full_simplex(self, *simplex):
+    def insert_full_simplex(self, *simplex, filtration=0.0):
         '''
         Insert a simplex into the SimplexTree. Inserts any faces of the
         simplex that are not already present.
@@ -271,13 +443,119 @@ class SimplexTree:
         -----------
         simplex :  list[Any]
             Simplex given as an enumeration of its vertices.
+        filtration : float, optional (default=0.0)
+            Filtration value of the simplex. Faces which are already
+            present have their filtration value lowered to this if
+            needed.
         '''
-        self._insert_full_simplex(*simplex)
+        self._insert_full_simplex(*simplex, filtration=filtration)
         return
     
-    def insert_full_simplices(self, simplices):
-        for simplex in simplices:
-            self.insert_full_simplex(*simplex)
+    def insert_full_simplices(self, simplices, filtrations=None):
+        '''
+        Insert simplices into the SimplexTree, along with any of their
+        faces that are not already present.
+
+        Duplicate simplices are dropped and the rest are inserted from
+        the highest dimension down, so that a simplex which is a face of
+        one inserted earlier is found to be present immediately.
+
+        Parameters:
+        -----------
+        simplices : list[list[Any]]
+            Simplices, each given as an enumeration of its vertices.
+        filtrations : list[float], optional (default=None)
+            Filtration value of each simplex. If None, all are 0.
+        '''
+        if filtrations is None:
+            filtrations = [0.0] * len(simplices)
+
+        # Keep the lowest filtration value of any duplicate simplex
+        lowest = dict()
+        for simplex, filtration in zip(simplices, filtrations):
+            simplex = tuple(simplex)
+            lowest[simplex] = min(lowest.get(simplex, filtration), filtration)
+
+        for simplex in sorted(lowest, key=len, reverse=True):
+            self.insert_full_simplex(*simplex, filtration=lowest[simplex])
+
+    def insert_full_simplices_from_file(self, path, chunk_size=65536,
+                                        progress=None):
+        '''
+        Insert the simplices listed in a text file, one per line, along
+        with any of their faces that are not already present.
+
+        The file is streamed in chunks by
+        simplicial.io.read_simplex_blocks, and each block is inserted
+        before the next is read, so memory use is bounded by the chunk
+        size rather than the size of the file.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File listing simplices as integer vertex labels.
+        chunk_size : int, optional (default=65536)
+            Maximum number of lines read at once.
+        progress : callable, optional (default=None)
+            Called after each chunk as progress(bytes_read, bytes_total).
+        '''
+        for simplices in read_simplex_blocks(path, chunk_size, progress):
+            self.insert_full_simplices(simplices.tolist())
+
+    def _expand(self, node, max_dim):
+        '''
+        Helper function for flag complex expansion. Adds to node every
+        child which would close a clique, then recurses into its
+        children.
+
+        Parameters:
+        -----------
+        node : SimplexNode
+            A node of depth at least 2 whose siblings are complete.
+        max_dim : int
+            Maximum dimension of simplices to add.
+        '''
+        if node.depth > max_dim:
+            return
+
+        # A sibling w extends node to a clique exactly when the edge
+        # (label, w) is present, so intersect the two label sets
+        siblings = node.parent.children
+        neighbours = self.root.children[node.label].children
+        if len(siblings) > len(neighbours):
+            siblings, neighbours = neighbours, siblings
+        for label in [w for w in siblings if w in neighbours]:
+            if label not in node.children:
+                # A clique enters the filtration with its last edge
+                filtration = max(
+                    node.filtration,
+                    node.parent.children[label].filtration,
+                    self.root.children[node.label].children[label].filtration,
+                )
+                self._create_node(label, node, filtration=filtration)
+
+        for child in list(node.children.values()):
+            self._expand(child, max_dim)
+
+    def expansion(self, max_dim):
+        '''
+        Expand the complex into the flag (clique) complex of its
+        1-skeleton, adding every simplex of dimension at most max_dim
+        whose edges are all present.
+
+        The tree is expanded from the top down, as described by
+        Boissonnat & Maria: the children of a node are those siblings
+        that are also neighbours of its last vertex.
+
+        Parameters:
+        -----------
+        max_dim : int
+            Maximum dimension of simplices to add.
+        '''
+        for vertex in list(self.root.children.values()):
+            for edge in list(vertex.children.values()):
+                self._expand(edge, max_dim)
+        return
 
     def remove_simplex(self, *simplex):
         '''
@@ -294,12 +572,10 @@ class SimplexTree:
 
         cofaces = self.locate_cofaces(*simplex)
         for coface in cofaces:
-            removed_node = coface.parent.children.pop(coface.label, None)
-            del removed_node
+            self._remove_node(coface)
 
         simplex_node = self.search_simplex(*simplex)
-        removed_node = simplex_node.parent.children.pop(simplex_node.label, None)
-        del removed_node
+        self._remove_node(simplex_node)
         
         return
 
@@ -323,42 +599,34 @@ class SimplexTree:
 
         # Find nodes of depth at least len(simplex) which contain last(simplex)
         all_linked_nodes = []
-        to_visit = [self.root]
-        visited_depths = []
-        while to_visit:
-            node = to_visit.pop(0)
-            if node.depth < min_depth or node.depth in visited_depths:
-                to_visit.extend(node.children.values())
-                continue
-            if node.label == last:
-                all_linked_nodes.extend(node.get_linked_nodes())
-                visited_depths.append(node.depth)
-            to_visit.extend(node.children.values())
+        for depth in range(min_depth, self.dimension + 2):
+            entry = self._linked_nodes.get((depth, last))
+            if entry is not None:
+                all_linked_nodes.extend(entry.get_linked_nodes())
 
         # Perform upward traversals from each such node and check if coface
         coface_roots = []
         for linked_node in all_linked_nodes:
-            
-            vertex_list = list(reversed(simplex))
-            node = linked_node
-            while node.parent is not None:
-                if not vertex_list:
-                    coface_roots.append(linked_node)
-                    break
-                if node.label == vertex_list[0]:
-                    vertex_list.pop(0)
+
+            # The linked node matches the last vertex, so match the rest
+            # of the simplex against its ancestors from the bottom up
+            remaining = len(simplex) - 1
+            node = linked_node.parent
+            while remaining and node.depth >= remaining:
+                if node.label == simplex[remaining-1]:
+                    remaining -= 1
                 node = node.parent
-            if not vertex_list:
+
+            # Stops early once too few ancestors are left to match
+            if not remaining:
                 coface_roots.append(linked_node)
-        
-        coface_roots = list(set(coface_roots))
 
         # Traverse subtree at each coface root to enumerate all cofaces
         cofaces = []
         for root in coface_roots:
-            to_visit = [root]
+            to_visit = deque([root])
             while to_visit:
-                node = to_visit.pop(0)
+                node = to_visit.popleft()
                 cofaces.append(node)
                 to_visit.extend(node.children.values())
         
@@ -384,9 +652,9 @@ class SimplexTree:
             raise ValueError(f'Simplex {simplex} is not in complex.')
 
         cofaces = []
-        to_visit = list(simplex_node.children.values())
+        to_visit = deque(simplex_node.children.values())
         while to_visit:
-            node = to_visit.pop(0)
+            node = to_visit.popleft()
             cofaces.append(node)
             to_visit.extend(node.children.values())
         
@@ -447,11 +715,75 @@ class SimplexTree:
                 return
         
         raise ValueError(f'Simplex {simplex} is not collapsible.')
+
+    def collapse(self):
+        '''
+        Simplify the complex by elementary collapses until no free faces
+        are left. The result is homotopy equivalent to the original
+        complex, so its Betti numbers are unchanged.
+
+        A face is free if it has exactly one coface, which is then a
+        maximal simplex. The cofacets of every simplex are gathered once
+        up front, and a work queue holds the simplices that may be free.
+        Each collapse removes a free face together with its coface, and
+        queues only the facets whose cofacets changed.
+
+        Returns:
+        --------
+        self : SimplexTree
+            The collapsed SimplexTree, modified in place.
+        '''
+        facets = dict()
+        cofacets = dict()
+        for k in reversed(range(self.dimension+1)):
+            for node in self.locate_k_simplices(k):
+                cofacets.setdefault(node, set())
+                if k == 0:
+                    facets[node] = []
+                    continue
+                facets[node] = self._get_facets(node)
+                for facet in facets[node]:
+                    cofacets.setdefault(facet, set()).add(node)
+
+        queue = deque(node for node in cofacets if len(cofacets[node]) == 1)
+
+        def detach(node):
+            # Queue any facet left with a single cofacet, and the facets
+            # of any facet left maximal
+            for facet in facets.pop(node):
+                remaining = cofacets[facet]
+                remaining.discard(node)
+                if len(remaining) == 1:
+                    queue.append(facet)
+                elif not remaining:
+                    queue.extend(facets[facet])
+            del cofacets[node]
+
+        while queue:
+            face = queue.popleft()
+            if len(cofacets.get(face, ())) != 1:
+                continue
+            coface = next(iter(cofacets[face]))
+            if cofacets[coface]:
+                continue
+
+            # The coface is maximal, so both nodes are leaves once the
+            # coface is gone
+            detach(coface)
+            self._remove_node(coface)
+            detach(face)
+            self._remove_node(face)
+
+        return self
     
     def locate_k_simplices(self, k):
         '''
         Locate all k-simplices in the SimplexTree.
 
+        The nodes of each dimension are registered as they are created
+        and removed, so this takes time proportional to the number of
+        k-simplices.
+
         Parameters:
         -----------
         k : int
@@ -464,43 +796,226 @@ class SimplexTree:
             the SimplexTree.
         '''
 
-        k_simplices = []
-        
-        to_visit = [self.root]
-        while to_visit:
-            node = to_visit.pop(0)
+        return list(self._k_simplices.get(k, ()))
 
-            if node.depth == k + 1:
-                k_simplices.append(node)
+    def _get_facets(self, node):
+        '''
+        Locates all facets of the simplex represented by a node, without
+        converting its vertices to a list of labels first.
 
-            if node.depth <= k:
-                to_visit.extend(node.children.values())
+        Parameters:
+        -----------
+        node : SimplexNode
+            Node representing a simplex in the SimplexTree.
+
+        Returns:
+        --------
+        facets : list[SimplexNode]
+            Nodes of the facets of the simplex, where the i-th facet
+            omits the i-th vertex. Raises a ValueError if any facet is
+            missing from the tree.
+        '''
+        ancestors = []
+        while node is not None:
+            ancestors.append(node)
+            node = node.parent
+        ancestors.reverse()
+
+        vertices = [ancestor.label for ancestor in ancestors[1:]]
+
+        # Dropping the i-th vertex leaves the path to the i-th ancestor
+        # followed by the remaining vertices
+        facets = [
+            self.search_simplex(*vertices[i+1:], from_node=ancestors[i])
+            for i in range(len(vertices))
+        ]
+        if None in facets:
+            raise ValueError(
+                'Boundary matrix dimension mismatch. Check triangulation.'
+            )
+        return facets
+
+    def _boundary_block(self, k):
+        '''
+        Helper function for assembling the k-th boundary matrix in CSC
+        format directly from the facets of each node, without converting
+        any labels.
+        '''
+        k_simplices = self.locate_k_simplices(k)
+        n_cols = len(k_simplices)
+
+        if k == 0:
+            n_rows = 1
+            rows = np.zeros(n_cols, dtype=np.int64)
+        else:
+            faces = self.locate_k_simplices(k-1)
+            n_rows = len(faces)
+            indices = {face: i for i, face in enumerate(faces)}
+            rows = np.array([
+                indices[facet]
+                for node in k_simplices
+                for facet in self._get_facets(node)
+            ], dtype=np.int64)
+            rows = np.sort(rows.reshape(n_cols, k+1), axis=1).flatten()
+
+        indptr = np.arange(0, (k+1) * n_cols + 1, k+1)
+        return csc_matrix(
+            (np.ones(rows.shape[0], dtype=np.int8), rows, indptr),
+            shape=(n_rows, n_cols),
+        )
+
+    def _cached_boundary_matrix(self):
+        '''
+        Helper function for getting the sparse boundary matrix used to
+        compute Betti numbers.
+
+        Each k-simplex is numbered by its position in locate_k_simplices.
+        The matrix is kept between calls, and only the boundary matrices
+        of dimensions in which simplices were created or removed since
+        the last call are rebuilt, so that the ranks of the others stay
+        cached in the SparseBoundaryMatrix. It must not be changed
+        outside of the SimplexTree.
+        '''
+        boundary_matrix = self._boundary_matrix
+        if boundary_matrix is None:
+            boundary_matrix = SparseBoundaryMatrix()
+            self._boundary_matrix = boundary_matrix
+            self._dirty = set(range(self.dimension+1))
 
-        return k_simplices
+        # Drop the matrices of any dimensions left empty, from the top
+        for k in sorted(boundary_matrix.boundary_matrices, reverse=True):
+            if k > self.dimension:
+                boundary_matrix.remove_boundary_matrix(k)
+
+        for k in sorted(self._dirty):
+            if k <= self.dimension:
+                boundary_matrix.add_boundary_matrix(
+                    k, self._boundary_block(k)
+                )
+        self._dirty = set()
+
+        return boundary_matrix
 
-    def boundary_matrix(self):
+    def boundary_matrix(self, with_simplices=False):
         '''
         Convert to sparse boundary matrix.
+
+        Each k-simplex is numbered by its position in locate_k_simplices.
+        The matrix holds copies of the boundary matrices cached for
+        computing Betti numbers, so it is independent of the tree.
+
+        Parameters:
+        -----------
+        with_simplices : bool, optional (default=False)
+            If True, each k-simplex is also given by its vertex labels,
+            so that simplices can be appended to the matrix. This needs
+            the labels of every simplex, so is slower.
+
+        Returns:
+        --------
+        boundary_matrix : SparseBoundaryMatrix
+            Sparse boundary matrix of the complex.
         '''
-        
+        cached = self._cached_boundary_matrix()
+
         boundary_matrix = SparseBoundaryMatrix()
-        for k in range(self.dimension+1):
-            if k == 0:
+        for k in sorted(cached.boundary_matrices):
+            k_simplices = None
+            if with_simplices and k == 0:
                 k_simplices = [
                     s._get_safe_label() for s in self.locate_k_simplices(k)
                 ]
-            else:
+            elif with_simplices:
                 k_simplices = [
                     s.get_vertex_list(
                         safe=True
                     ) for s in self.locate_k_simplices(k)
                 ]
-            if k_simplices:
-                boundary_matrix.add_simplices(k_simplices)
+            boundary_matrix.add_boundary_matrix(
+                k, cached.boundary_matrices[k].copy(), simplices=k_simplices
+            )
 
         return boundary_matrix
 
-    def betti_numbers(self, reduced=False):
+    def morse_boundary_matrix(self):
+        '''
+        Convert to the sparse boundary matrix of a Morse complex with the
+        same homology, built from the critical simplices of a greedy
+        acyclic matching only.
+
+        Each critical k-simplex is numbered by its position among the
+        critical k-simplices in locate_k_simplices.
+        '''
+        nodes = [
+            node
+            for k in range(self.dimension+1)
+            for node in self.locate_k_simplices(k)
+        ]
+        indices = {node: i for i, node in enumerate(nodes)}
+        dims = np.array([node.depth - 1 for node in nodes])
+        facets = [
+            [indices[facet] for facet in self._get_facets(node)]
+            if node.depth > 1 else []
+            for node in nodes
+        ]
+
+        partners, times = acyclic_matching(facets)
+        critical = np.flatnonzero(partners < 0)
+
+        # Position of each critical cell among those of its dimension
+        positions = dict()
+        for k in range(self.dimension+1):
+            cells = critical[dims[critical] == k]
+            positions.update(zip(cells.tolist(), range(cells.shape[0])))
+
+        boundary_matrix = SparseBoundaryMatrix()
+        n_rows = 1
+        for k in range(self.dimension+1):
+            cells = critical[dims[critical] == k]
+            n_cols = cells.shape[0]
+
+            indptr = np.zeros(n_cols + 1, dtype=np.int64)
+            rows = []
+            for j, cell in enumerate(cells):
+                if k == 0:
+                    rows.append(0)
+                else:
+                    boundary = morse_boundary(
+                        cell, facets, dims, partners, times
+                    )
+                    rows.extend(positions[face] for face in boundary)
+                indptr[j+1] = len(rows)
+
+            rows = np.array(rows, dtype=np.int64)
+            matrix = csc_matrix(
+                (np.ones(rows.shape[0], dtype=np.int8), rows, indptr),
+                shape=(n_rows, n_cols),
+            )
+            boundary_matrix.add_boundary_matrix(k, matrix)
+            n_rows = n_cols
+
+        return boundary_matrix
+
+    def _graph_betti_numbers(self):
+        '''
+        Helper function for computing the Betti numbers of a complex of
+        dimension at most 1 by union-find. Betti_0 counts the connected
+        components, and Betti_1 then follows from the Euler relation.
+        '''
+        vertices = self.locate_k_simplices(0)
+        indices = {node.label: i for i, node in enumerate(vertices)}
+        edges = np.array([
+            (indices[node.parent.label], indices[node.label])
+            for node in self.locate_k_simplices(1)
+        ], dtype=np.int64).reshape(-1, 2)
+
+        rank = union_find_rank(edges, len(vertices))
+        betti_numbers = [len(vertices) - rank]
+        if self.dimension == 1:
+            betti_numbers.append(edges.shape[0] - rank)
+        return betti_numbers
+
+    def betti_numbers(self, reduced=False, morse=False, **kwargs):
         '''
         Compute the betti numbers of the complex represented by self.
 
@@ -508,24 +1023,246 @@ class SimplexTree:
         -----------
         reduced : bool
             Return reduced Betti numbers.
+        morse : bool, optional (default=False)
+            Compute the Betti numbers from the smaller boundary matrices
+            of a Morse complex. See morse_boundary_matrix.
+        kwargs : dict
+            Keyword arguments passed on to
+            SparseBoundaryMatrix.compute_betti_numbers.
+
+        If the SimplexTree tracks its homology, the Betti numbers are
+        read off the tracker instead, unless morse is set. Graphs, i.e.
+        complexes of dimension at most 1, need no boundary matrices
+        either, see _graph_betti_numbers.
         '''
         if not self.root.children:
             return []
-        boundary_matrix = self.boundary_matrix()
+        if not morse and (self._homology is not None or self.dimension <= 1):
+            if self._homology is not None:
+                self._update_homology()
+                betti_numbers = self._homology.betti_numbers()
+            else:
+                betti_numbers = self._graph_betti_numbers()
+            if reduced:
+                betti_numbers[0] -= 1
+            return betti_numbers
+        if morse:
+            # The Morse complex is rebuilt in full, but only once the
+            # complex has changed
+            generation, boundary_matrix = self._morse_matrix
+            if generation != self._generation:
+                boundary_matrix = self.morse_boundary_matrix()
+                self._morse_matrix = (self._generation, boundary_matrix)
+        else:
+            boundary_matrix = self._cached_boundary_matrix()
         if reduced:
-            return boundary_matrix.get_reduced_betti_numbers()
-        return boundary_matrix.get_betti_numbers()
+            return boundary_matrix.get_reduced_betti_numbers(**kwargs)
+        return boundary_matrix.get_betti_numbers(**kwargs)
+
+    def filtration_boundary_matrix(self):
+        '''
+        Assemble the boundary matrix of the whole filtered complex, with
+        simplices ordered by filtration value and then by dimension, so
+        that every face precedes its cofaces.
+
+        Returns:
+        --------
+        matrix : csc_matrix
+            Square matrix whose j-th column is the boundary of the j-th
+            simplex in the filtration order.
+        nodes : list[SimplexNode]
+            Nodes of the simplices, in the filtration order.
+        '''
+        nodes = [
+            node
+            for k in range(self.dimension+1)
+            for node in self.locate_k_simplices(k)
+        ]
+        # The sort is stable, so the tree order breaks any remaining ties
+        nodes.sort(key=lambda node: (node.filtration, node.depth))
+        indices = {node: i for i, node in enumerate(nodes)}
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        rows = []
+        for j, node in enumerate(nodes):
+            if node.depth > 1:
+                rows.extend(sorted(
+                    indices[facet] for facet in self._get_facets(node)
+                ))
+            indptr[j+1] = len(rows)
+
+        rows = np.array(rows, dtype=np.int64)
+        matrix = csc_matrix(
+            (np.ones(rows.shape[0], dtype=np.int8), rows, indptr),
+            shape=(len(nodes), len(nodes)),
+        )
+        return matrix, nodes
+
+    def persistence(self):
+        '''
+        Compute the persistence barcode of the filtered complex.
+
+        The filtration-ordered boundary matrix is reduced once by the
+        standard column algorithm. A column with pivot row i pairs the
+        simplex it represents, which kills a class, with the i-th
+        simplex, which gave birth to it. Simplices which are left
+        unpaired give birth to classes that never die.
+
+        Source: Edelsbrunner, Letscher & Zomorodian - "Topological
+        Persistence and Simplification"
+
+        Returns:
+        --------
+        barcode : list[tuple]
+            Sorted list of (dimension, birth, death) tuples, one per
+            persistent homology class of positive length. Classes that
+            never die have death equal to np.inf.
+        '''
+        matrix, nodes = self.filtration_boundary_matrix()
+        indptr, indices = column_arrays(matrix)
+        pivots = reduce_columns(indptr, indices, len(nodes))
+
+        paired = np.zeros(len(nodes), dtype=bool)
+        barcode = []
+        for j in np.flatnonzero(pivots >= 0):
+            i = pivots[j]
+            paired[[i, j]] = True
+            birth, death = nodes[i].filtration, nodes[j].filtration
+            if birth < death:
+                barcode.append((nodes[i].depth - 1, birth, death))
+
+        for i in np.flatnonzero(~paired):
+            barcode.append((nodes[i].depth - 1, nodes[i].filtration, np.inf))
+
+        barcode.sort()
+        return barcode
+
+    def betti_curve(self, values):
+        '''
+        Compute the Betti numbers of the subcomplex of simplices with
+        filtration value at most each given value, from a single
+        persistence computation.
+
+        Parameters:
+        -----------
+        values : list[float]
+            Filtration values at which to evaluate the Betti numbers.
+
+        Returns:
+        --------
+        betti_curve : ndarray
+            Array of shape (len(values), dimension+1) whose row r holds
+            the Betti numbers at the r-th value.
+        '''
+        values = np.asarray(values, dtype=float)
+        betti_curve = np.zeros(
+            (values.shape[0], self.dimension+1), dtype=np.int64
+        )
+        for dim, birth, death in self.persistence():
+            betti_curve[:, dim] += (birth <= values) & (values < death)
+        return betti_curve
 
     def euler_characteristic(self):
         '''
         Compute Euler characteristic of the complex represented by self.
+
+        By the Euler-Poincare theorem, this is the alternating sum of
+        the f-vector, so no homology needs to be computed.
         '''
-        betti_numbers = self.betti_numbers()
-        return sum(betti_numbers[::2]) - sum(betti_numbers[1::2])
+        f_vector = self.f_vector()
+        return sum(f_vector[::2]) - sum(f_vector[1::2])
 
     def to_dict(self):
         return self.root._to_dict()
 
+    def save(self, path):
+        '''
+        Save the complex to a single binary file. Vertex labels are
+        interned, and each simplex is stored as the id of its last
+        vertex, the index of its parent and its filtration value, with
+        simplices listed by dimension so that parents come first. See
+        simplicial.serialization.save_arrays.
+
+        Vertex labels must be numbers, strings, or tuples of these of
+        one length, so that they can be held in a NumPy array.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File to write.
+        '''
+        labels = list(self.root.children)
+        label_array = np.asarray(labels)
+        tuple_labels = label_array.ndim > 1
+        restored = label_array.tolist()
+        if tuple_labels:
+            restored = [tuple(label) for label in restored]
+        if label_array.dtype.hasobject or restored != labels:
+            raise ValueError('Vertex labels cannot be saved as an array.')
+
+        label_ids = {label: i for i, label in enumerate(labels)}
+        nodes = [
+            node
+            for k in range(self.dimension+1)
+            for node in self.locate_k_simplices(k)
+        ]
+        indices = {node: i for i, node in enumerate(nodes)}
+        indices[self.root] = -1
+
+        save_arrays(
+            path,
+            {
+                'labels': label_array,
+                'label_ids': np.array(
+                    [label_ids[node.label] for node in nodes], dtype=np.int64
+                ),
+                'parents': np.array(
+                    [indices[node.parent] for node in nodes], dtype=np.int64
+                ),
+                'filtrations': np.array(
+                    [node.filtration for node in nodes], dtype=np.float64
+                ),
+            },
+            metadata={'tuple_labels': bool(tuple_labels)},
+        )
+
+    @classmethod
+    def load(cls, path, track_homology=False):
+        '''
+        Load a complex saved by save.
+
+        Parameters:
+        -----------
+        path : str or PathLike
+            File to read.
+        track_homology : bool, optional (default=False)
+            See SimplexTree.
+
+        Returns:
+        --------
+        simplex_tree : SimplexTree
+            The saved complex.
+        '''
+        arrays, metadata = load_arrays(path)
+
+        labels = arrays['labels'].tolist()
+        if metadata['tuple_labels']:
+            labels = [tuple(label) for label in labels]
+
+        simplex_tree = cls(track_homology=track_homology)
+        nodes = []
+        for label_id, parent, filtration in zip(
+            arrays['label_ids'].tolist(),
+            arrays['parents'].tolist(),
+            arrays['filtrations'].tolist(),
+        ):
+            parent = simplex_tree.root if parent < 0 else nodes[parent]
+            nodes.append(simplex_tree._create_node(
+                labels[label_id], parent, filtration=filtration
+            ))
+
+        return simplex_tree
+
     def __repr__(self):
         res = 'SimplexTree('
         vertices = [str(vert) for vert in self.root.children.keys()]
@@ -0,0 +1,122 @@
+import json
+import os
+
+import numpy as np
+
+from scipy.sparse import csc_matrix
+
+# Version of the on-disk layout written by write_store
+STORE_FORMAT = 1
+
+MANIFEST = 'manifest.json'
+
+
+def _array_path(directory, p, name):
+    '''
+    Helper function for getting the path of the file holding one array
+    of the p-th boundary matrix.
+    '''
+    return os.path.join(directory, f'{p}_{name}.npy')
+
+
+def write_store(directory, boundary_matrices, index_maps=None):
+    '''
+    Write boundary matrices to an on-disk store.
+
+    Each boundary matrix is written in CSC format as separate .npy files
+    for its indptr, indices and data arrays, along with the simplices
+    indexing its columns where given. A manifest records the dimension
+    and shape of every matrix.
+
+    Parameters:
+    -----------
+    directory : str or PathLike
+        Directory to write to. Created if it does not exist.
+    boundary_matrices : dict
+        Dictionary mapping each dimension p to its boundary matrix.
+    index_maps : dict, optional (default=None)
+        Dictionary mapping each dimension p to the p-simplices indexing
+        the columns of its boundary matrix.
+    '''
+    index_maps = index_maps if index_maps is not None else dict()
+    os.makedirs(directory, exist_ok=True)
+
+    shapes = dict()
+    for p, mat in boundary_matrices.items():
+        mat = csc_matrix(mat)
+
+        # Store both index arrays in one dtype, so that they can be
+        # mapped back in without conversion
+        dtype = np.promote_types(mat.indices.dtype, mat.indptr.dtype)
+        np.save(
+            _array_path(directory, p, 'indptr'), mat.indptr.astype(dtype)
+        )
+        np.save(
+            _array_path(directory, p, 'indices'), mat.indices.astype(dtype)
+        )
+        np.save(_array_path(directory, p, 'data'), mat.data.astype(np.int8))
+        shapes[str(p)] = list(mat.shape)
+
+        if p in index_maps:
+            np.save(
+                _array_path(directory, p, 'simplices'),
+                np.asarray(index_maps[p]),
+            )
+
+    manifest = {
+        'format': STORE_FORMAT,
+        'shapes': shapes,
+        'simplices': sorted(int(p) for p in index_maps),
+    }
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f)
+
+
+def read_store(directory, mmap=True):
+    '''
+    Open the boundary matrices in an on-disk store written by
+    write_store.
+
+    Parameters:
+    -----------
+    directory : str or PathLike
+        Directory to read from.
+    mmap : bool, optional (default=True)
+        If True, arrays are memory-mapped read-only rather than read, so
+        opening the store is almost instant and their contents are only
+        paged in when accessed.
+
+    Returns:
+    --------
+    boundary_matrices : dict
+        Dictionary mapping each dimension p to its boundary matrix as a
+        CSC matrix backed by the stored arrays.
+    index_maps : dict
+        Dictionary mapping each dimension p to the stored p-simplices,
+        where present.
+    '''
+    with open(os.path.join(directory, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != STORE_FORMAT:
+        raise ValueError(
+            f'Unsupported store format {manifest.get("format")!r}.'
+        )
+
+    mmap_mode = 'r' if mmap else None
+
+    def load(p, name):
+        return np.load(_array_path(directory, p, name), mmap_mode=mmap_mode)
+
+    shapes = {int(p): tuple(shape) for p, shape in manifest['shapes'].items()}
+
+    boundary_matrices = dict()
+    for p in sorted(shapes):
+        boundary_matrices[p] = csc_matrix(
+            (load(p, 'data'), load(p, 'indices'), load(p, 'indptr')),
+            shape=shapes[p],
+        )
+
+    index_maps = {p: load(p, 'simplices') for p in manifest['simplices']}
+
+    return boundary_matrices, index_maps